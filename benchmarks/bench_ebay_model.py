@@ -0,0 +1,64 @@
+import re
+import json
+import timeit
+import tracemalloc
+
+from utils.extractors import EbayModelExtractor
+from benchmarks.fixtures import load, is_recorded, ebay_item, EBAY_ITEM
+
+NUMBER = 50
+
+LAYOUTS = {"synthetic, module last": lambda: ebay_item(position=1, decoys=0),
+           "synthetic, module among others": ebay_item}
+
+REGEX = re.compile(r"\[\]\)\.concat\((.*)\)</script></body>")
+
+
+def baseline(html: str) -> dict:
+    """The original greedy regex and whole-model json.loads"""
+    json_data = json.loads(REGEX.search(html).group(1))["o"]["w"][0][2]["model"]["modules"]
+
+    return json_data["ABOUT_THIS_ITEM"]["sections"]["features"]["dataItems"]
+
+
+def peak_memory(candidate) -> int:
+    """Measures the peak memory allocated by a single call"""
+    tracemalloc.start()
+
+    candidate()
+
+    _, peak = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+
+    return peak
+
+
+def main() -> None:
+    pages = {name: layout() for name, layout in LAYOUTS.items()}
+
+    if is_recorded(EBAY_ITEM):
+        pages["recorded"] = load(EBAY_ITEM)
+    else:
+        print(f"no recorded {EBAY_ITEM}, timing synthetic pages only (see benchmarks/record.py)")
+
+    for page, html in pages.items():
+        extractor = EbayModelExtractor()
+
+        candidates = {"baseline (regex + json.loads)": lambda: baseline(html),
+                      "EbayModelExtractor": lambda: extractor.extract(html)}
+
+        print(f"{page}: {len(html) / 1024:.0f} KB")
+
+        for name, candidate in candidates.items():
+            seconds = timeit.timeit(candidate, number=NUMBER) / NUMBER
+
+            peak = peak_memory(candidate) / 1024
+
+            print(f"  {name:<30} {seconds * 1000:>8.2f} ms/item {peak:>10.0f} KB peak")
+
+        print(f"  layouts: {dict(extractor.layouts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import statistics
+import multiprocessing
+from typing import Any
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.server import StandIn
+
+SCENARIOS = ["scrape", "scrape_async", "clean"]
+
+
+def time_fetches(fetcher: Any, latencies: list[float]) -> None:
+    """Records the duration of every fetch, retries included"""
+    fetch, fetch_async = fetcher.fetch, fetcher.fetch_async
+
+    def timed_fetch(*args, **kwargs) -> Any:
+        start = time.perf_counter()
+
+        try:
+            return fetch(*args, **kwargs)
+
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    async def timed_fetch_async(*args, **kwargs) -> Any:
+        start = time.perf_counter()
+
+        try:
+            return await fetch_async(*args, **kwargs)
+
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    fetcher.fetch, fetcher.fetch_async = timed_fetch, timed_fetch_async
+
+
+def create_input(base_url: str, pages: int, path: str) -> None:
+    """Writes the listings of the stand-in results pages as cleaner input"""
+    import pandas as pd
+
+    from main import COLUMNS
+    from utils import Fetcher, HtmlExtractor
+
+    fetcher, extractor = Fetcher({}, retries=20, backoff=0.01), HtmlExtractor()
+
+    rows = []
+
+    for page in range(1, pages + 1):
+        html = fetcher.fetch(f"{base_url}/results", params={"pageNumber": str(page)}).text
+
+        for equipement in extractor.extract_results(html)[0]:
+            rows.append({**dict.fromkeys(COLUMNS, ""),
+                         "BIDADOO PRICE": equipement["price"],
+                         "SALE DATE": equipement["date"],
+                         "LINK TO LISTING": equipement["link"]})
+
+    pd.DataFrame(rows, columns=COLUMNS).to_parquet(path, index=False)
+
+
+def run_scenario(scenario: str,
+                 base_url: str,
+                 pages: int,
+                 proxies: bool,
+                 threads: int) -> dict[str, Any]:
+    """Runs a scenario in a fresh working directory, measuring throughput, latency and memory"""
+    os.chdir(tempfile.mkdtemp(prefix=f"bench_{scenario}_"))
+
+    for directory in ("logs", "data", "cleaned"):
+        os.makedirs(directory)
+
+    sys.stderr = open(os.devnull, "w")
+
+    latencies = []
+
+    if scenario == "clean":
+        from clean_data import CleanExcelData
+        from utils import proxy_handler
+
+        create_input(base_url, pages, "input.parquet")
+
+        proxy_handler.PROXY_LISTS.clear()
+        proxy_handler.PROXY_LISTS[f"{base_url}/proxies"] = None
+
+        engine = CleanExcelData(input_path="input.parquet", thread_num=threads)
+        engine.proxy_handler.validate_url = f"{base_url}/robots.txt"
+
+        if not proxies:
+            engine.fetcher.proxy_pool = None
+
+        entry_point, counter = engine.run, engine.done
+    else:
+        from main import BidadooScraper
+
+        engine = BidadooScraper()
+        engine.base_url = f"{base_url}/results"
+
+        entry_point, counter = getattr(engine, scenario), engine.crawled
+
+    time_fetches(engine.fetcher, latencies)
+
+    # Dependencies are imported on first use; startup is measured by bench_startup instead
+    import aiohttp, pandas, pyarrow.parquet
+
+    start = time.perf_counter()
+
+    entry_point()
+
+    seconds = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+
+    return {"scenario": scenario,
+            "items": counter.value,
+            "seconds": seconds,
+            "items_per_second": counter.value / seconds,
+            "fetches": len(latencies),
+            "p50_ms": quantiles[49] * 1000,
+            "p99_ms": quantiles[98] * 1000,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replays fixtures through a local stand-in server")
+    parser.add_argument("scenarios", nargs="*", default=SCENARIOS, 
+                        help="any of {}".format(", ".join(SCENARIOS)))
+    parser.add_argument("--pages", type=int, default=5, help="number of results pages")
+    parser.add_argument("--latency", type=float, default=0.05, help="base response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="random extra latency in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0, help="share of failed responses")
+    parser.add_argument("--proxies", type=int, default=4, help="stand-in proxies for the cleaner, 0 to go direct")
+    parser.add_argument("--threads", type=int, default=20, help="cleaner threads")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to a json file")
+
+    args = parser.parse_args()
+
+    for scenario in set(args.scenarios) - set(SCENARIOS):
+        parser.error(f"unknown scenario: {scenario}")
+
+    results = []
+
+    print(f"{'scenario':<14} {'items':>6} {'items/s':>9} {'fetches':>8} {'p50 ms':>8} "
+          f"{'p99 ms':>8} {'RSS MB':>8} {'failures':>9}")
+
+    for scenario in args.scenarios:
+        with StandIn(args.pages, args.latency, args.jitter, args.failure_rate,
+                     args.proxies, args.seed) as stand_in:
+            context = multiprocessing.get_context("spawn")
+
+            with ProcessPoolExecutor(1, mp_context=context) as executor:
+                result = executor.submit(run_scenario, scenario, stand_in.base_url, args.pages,
+                                         args.proxies > 0, args.threads).result()
+
+            result["requests"] = dict(stand_in.requests)
+
+        results.append(result)
+
+        print(f"{scenario:<14} {result['items']:>6} {result['items_per_second']:>9.1f} "
+              f"{result['fetches']:>8} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+              f"{result['peak_rss_mb']:>8.1f} {result['requests'].get('failures', 0):>9}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"options": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import timeit
+
+from bs4 import BeautifulSoup
+
+from utils.extractors import HtmlExtractor, LexborHTMLParser, BS4_PARSER
+from benchmarks.fixtures import load, is_recorded, RESULTS_PAGE, IFRAME_DESC, EBAY_ITEM
+
+NUMBER = 50
+
+
+def baseline(results_html: str, ebay_html: str, iframe_html: str) -> None:
+    """The original html.parser extraction, parsing the results page twice"""
+    soup = BeautifulSoup(results_html, "html.parser")
+
+    for equipement in soup.find("div", {"class": "results"}).select("div.category__ct"):
+        equipement.select_one("div.category__txt > p").get_text(strip=True)
+        equipement.select_one("a.category__butt")["href"]
+
+    BeautifulSoup(results_html, "html.parser").select_one("div.results")["data-num-pages"]
+
+    BeautifulSoup(ebay_html, "html.parser").select_one("iframe#desc_ifr")["src"]
+
+    soup = BeautifulSoup(iframe_html, "html.parser")
+
+    [li.get_text(strip=True) for li in soup.select_one("div.container").select("ul.list-group li")]
+
+
+def extractor(backend: str, results_html: str, ebay_html: str, iframe_html: str) -> None:
+    """The shared extraction layer, parsing each document once"""
+    html_extractor = HtmlExtractor(backend)
+
+    html_extractor.extract_results(results_html)
+    html_extractor.extract_iframe_source(ebay_html)
+    html_extractor.extract_item_slugs(iframe_html)
+
+
+def main() -> None:
+    names = (RESULTS_PAGE, EBAY_ITEM, IFRAME_DESC)
+
+    print("fixtures: {}".format(", ".join(
+        f"{name} ({'recorded' if is_recorded(name) else 'synthetic'})" for name in names)))
+
+    pages = tuple(load(name) for name in names)
+
+    candidates = {"baseline (html.parser x2)": lambda: baseline(*pages)}
+
+    for backend in ["html.parser", BS4_PARSER, "selectolax"]:
+        if backend == "selectolax" and LexborHTMLParser is None:
+            continue
+
+        candidates[f"extractor ({backend})"] = lambda backend=backend: extractor(backend, *pages)
+
+    for name, candidate in candidates.items():
+        seconds = timeit.timeit(candidate, number=NUMBER) / NUMBER
+
+        print(f"{name:<30} {seconds * 1000:>8.2f} ms/item")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = {"python": ["-c", "pass"],
+            "import main": ["-c", "import main"],
+            "import clean_data": ["-c", "import clean_data"],
+            "import pipeline": ["-c", "import pipeline"],
+            "main.py --help": ["main.py", "--help"],
+            "clean_data.py --help": ["clean_data.py", "--help"],
+            "pipeline.py --help": ["pipeline.py", "--help"]}
+
+HEAVY_MODULES = ("pandas", "pyarrow", "requests", "aiohttp", "bs4", "fake_useragent")
+
+
+def run(args: list[str]) -> float:
+    """Runs a fresh interpreter, returning its wall time in seconds"""
+    start = time.perf_counter()
+
+    subprocess.run([sys.executable, *args], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    return time.perf_counter() - start
+
+
+def heavy_imports(module: str) -> list[str]:
+    """Lists the heavy dependencies pulled in by importing an entry point"""
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+
+    return output.split()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Times the startup of the entry points")
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per command")
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="fail when a command takes longer than this many seconds")
+
+    args = parser.parse_args()
+
+    print(f"{'command':<24} {'median ms':>10} {'max ms':>8}")
+
+    slowest = 0.0
+
+    for name, command in COMMANDS.items():
+        seconds = [run(command) for _ in range(args.runs)]
+
+        slowest = max(slowest, max(seconds))
+
+        print(f"{name:<24} {statistics.median(seconds) * 1000:>10.1f} {max(seconds) * 1000:>8.1f}")
+
+    for module in ("main", "clean_data", "pipeline"):
+        print(f"{module} imports: {', '.join(heavy_imports(module)) or 'no heavy dependencies'}")
+
+    if slowest > args.budget:
+        sys.exit(f"Startup took {slowest:.2f}s, over the {args.budget:.2f}s budget")
+
+
+if __name__ == "__main__":
+    main()
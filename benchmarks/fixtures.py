@@ -0,0 +1,112 @@
+import json
+from pathlib import Path
+
+FIXTURES_PATH = Path(__file__).parent / "fixtures"
+
+RESULTS_PAGE = "results_page.html"
+EBAY_ITEM = "ebay_item.html"
+IFRAME_DESC = "iframe_desc.html"
+PROXY_LIST = "proxy_list.html"
+
+
+def results_page(items: int = 40, total_pages: int = 250) -> str:
+    """Builds a bidadoo results page shaped like https://www.bidadoo.com/results"""
+    equipements = "".join(
+        f'<div class="category__ct"><div class="category__img"><img src="/img/{i}.jpg"></div>'
+        f'<div class="category__head"><h3>2019 Kubota KX0{i}-4 Mini Excavator</h3></div>'
+        f'<div class="category__txt"><p>${i},250.00</p><span>Lot {i}</span></div>'
+        f'<a class="category__butt" href="https://www.ebay.com/itm/{100000 + i}">Sold 9/7/2023</a>'
+        f'</div>' for i in range(items))
+
+    navigation = "".join(f'<li><a href="/results?pageNumber={i}">{i}</a></li>' for i in range(1, 200))
+
+    return (f'<html><head><title>Results</title></head><body>'
+            f'<nav><ul>{navigation}</ul></nav>'
+            f'<div class="results" data-num-pages="{total_pages}">{equipements}</div>'
+            f'<footer>{"<p>bidadoo</p>" * 200}</footer></body></html>')
+
+
+def ebay_item(filler_modules: int = 400, position: float = 0.5, decoys: int = 3) -> str:
+    """Builds an ebay item page with an embedded model of a few hundred KB
+
+    ABOUT_THIS_ITEM sits at `position` among the other modules, and the
+    `decoys` modules before it use its name as a key in their tracking
+    data, so the extractor can't rely on the first match or the last module.
+    """
+    features = {"condition": {"values": [{"textSpans": [{"text": "Used"}]}]},
+                "modelYear": {"values": [{"textSpans": [{"text": "2019"}]}]},
+                "make": {"values": [{"textSpans": [{"text": "Kubota"}]}]},
+                "model": {"values": [{"textSpans": [{"text": "KX040-4"}]}]},
+                "hours": {"values": [{"textSpans": [{"text": "1,250"}]}]},
+                **{f"feature{i}": {"values": [{"textSpans": [{"text": "x" * 20}]}]} for i in range(20)}}
+
+    about_this_item = {"_type": "SectionModule", "sections": {"features": {"dataItems": features}}}
+
+    before = int(filler_modules * position)
+
+    modules = {}
+
+    for i in range(filler_modules):
+        if i == before:
+            modules["ABOUT_THIS_ITEM"] = about_this_item
+
+        module = {"_type": "Filler", "values": [{"textSpans": [{"text": "x" * 40}]}] * 10}
+
+        if before - decoys <= i < before:
+            module["tracking"] = {"ABOUT_THIS_ITEM": {"impressionId": str(i)}}
+
+        modules[f"MODULE_{i}"] = module
+
+    modules.setdefault("ABOUT_THIS_ITEM", about_this_item)
+
+    model = {"o": {"w": [["id", 0, {"model": {"modules": modules}}]]}}
+
+    return (f'<html><head><title>eBay</title></head><body>'
+            f'<div id="mainContent">{"<div><span>item</span></div>" * 500}'
+            f'<iframe id="desc_ifr" title="Item description" '
+            f'src="https://vi.vipr.ebaydesc.com/ws/eBayISAPI.dll?item=100000&amp;t=0"></iframe></div>'
+            f'<script>$ssgST=Date.now();</script>'
+            f'<script>(window.$MC||[]).concat({json.dumps(model)})</script></body></html>')
+
+
+def iframe_desc() -> str:
+    """Builds an ebay item description page"""
+    slugs = "".join(f"<li>{key}: {value}</li>" for key, value in
+                    (("Year", "2019"), ("Make", "Kubota"), ("Model", "KX040-4"), ("Hours", "1250")))
+
+    return (f'<html><body><div class="header">{"<p>terms</p>" * 100}</div>'
+            f'<div class="container"><h2>Details</h2><ul class="list-group">{slugs}</ul>'
+            f'{"<p>description</p>" * 300}</div></body></html>')
+
+
+def proxy_list(proxies: int = 300) -> str:
+    """Builds a proxy list page shaped like https://free-proxy-list.net/"""
+    rows = "".join(f"<tr><td>10.0.{i // 250}.{i % 250 + 1}</td><td>8080</td><td>US</td>"
+                   f"<td>United States</td><td>elite proxy</td><td>no</td><td>yes</td>"
+                   f"<td>1 min ago</td></tr>" for i in range(proxies))
+
+    return (f'<html><body><table class="table"><thead><tr><th>IP Address</th><th>Port</th>'
+            f'</tr></thead><tbody>{rows}</tbody></table></body></html>')
+
+
+def save(name: str, text: str) -> None:
+    """Records a fixture"""
+    FIXTURES_PATH.mkdir(exist_ok=True)
+
+    (FIXTURES_PATH / name).write_text(text, encoding="utf-8")
+
+
+def is_recorded(name: str) -> bool:
+    """Checks whether a fixture was recorded from a live page"""
+    return (FIXTURES_PATH / name).exists()
+
+
+def load(name: str) -> str:
+    """Loads a recorded fixture, falling back to a synthetic one"""
+    path = FIXTURES_PATH / name
+
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+
+    return {RESULTS_PAGE: results_page, EBAY_ITEM: ebay_item, 
+            IFRAME_DESC: iframe_desc, PROXY_LIST: proxy_list}[name]()
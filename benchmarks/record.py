@@ -0,0 +1,38 @@
+import argparse
+
+from main import HEADERS, PARAMS
+from utils import Fetcher, HtmlExtractor
+from utils.proxy_handler import PROXY_LISTS
+from benchmarks.fixtures import save, RESULTS_PAGE, EBAY_ITEM, IFRAME_DESC, PROXY_LIST
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Records live pages as benchmark fixtures")
+    parser.add_argument("--page", type=int, default=1, help="bidadoo results page to record")
+    parser.add_argument("--item", type=int, default=0, help="index of the listing to record")
+
+    args = parser.parse_args()
+
+    fetcher = Fetcher(HEADERS, retries=3)
+    extractor = HtmlExtractor()
+
+    results_html = fetcher.fetch("https://www.bidadoo.com/results",
+                                 params={**PARAMS, "pageNumber": str(args.page)}).text
+
+    equipements, _ = extractor.extract_results(results_html)
+
+    ebay_html = fetcher.fetch(equipements[args.item]["link"]).text
+
+    iframe_html = fetcher.fetch(extractor.extract_iframe_source(ebay_html)).text
+
+    proxies_html = fetcher.fetch(next(iter(PROXY_LISTS))).text
+
+    for name, text in ((RESULTS_PAGE, results_html), (EBAY_ITEM, ebay_html),
+                       (IFRAME_DESC, iframe_html), (PROXY_LIST, proxies_html)):
+        save(name, text)
+
+        print(f"{name:<20} {len(text) / 1024:>8.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
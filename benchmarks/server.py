@@ -0,0 +1,154 @@
+import re
+import time
+import random
+import threading
+from collections import Counter
+from functools import lru_cache
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from benchmarks.fixtures import load, RESULTS_PAGE, EBAY_ITEM, IFRAME_DESC, PROXY_LIST
+
+ITEM_LINK_REGEX = re.compile(r"https?://www\.ebay\.com/itm/(\d+)")
+NUM_PAGES_REGEX = re.compile(r'data-num-pages="\d+"')
+IFRAME_SRC_REGEX = re.compile(r"https?://[^\"'\s>]*ebaydesc\.com[^\"'\s>]*")
+TABLE_BODY_REGEX = re.compile(r"<tbody>.*?</tbody>", re.S)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves fixtures for bidadoo, ebay and proxy list urls, also when used as a proxy"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def __send(self, status: int, body: str = "") -> None:
+        """Sends a response"""
+        data = body.encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        stand_in: StandIn = self.server.stand_in
+
+        url = urlsplit(self.path)
+
+        route = url.path.split("/")[1]
+
+        stand_in.count(route)
+
+        if route in ("proxies", "robots.txt"):
+            return self.__send(200, stand_in.proxy_list() if route == "proxies" else "")
+
+        time.sleep(stand_in.delay())
+
+        if stand_in.fails():
+            stand_in.count("failures")
+
+            return self.__send(503)
+
+        if route == "results":
+            page = int(parse_qs(url.query).get("pageNumber", ["1"])[0])
+
+            return self.__send(200, stand_in.results_page(page))
+
+        if route == "itm":
+            return self.__send(200, stand_in.ebay_item(url.path.split("/")[-1]))
+
+        if route == "desc":
+            return self.__send(200, stand_in.iframe_desc())
+
+        self.__send(404)
+
+
+class StandIn:
+    """Local stand-in for bidadoo, ebay and the proxy lists, replaying recorded fixtures
+
+    Extra servers with the same routes act as proxies, so the proxy pool can
+    be exercised without leaving the machine.
+    """
+    def __init__(self,
+                 pages: int = 5,
+                 latency: float = 0.05,
+                 jitter: float = 0.05,
+                 failure_rate: float = 0,
+                 proxies: int = 0,
+                 seed: int = 0) -> None:
+        self.pages = pages
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = Counter()
+
+        self.servers = [self.__create_server() for _ in range(proxies + 1)]
+
+        self.base_url = "http://{}:{}".format(*self.servers[0].server_address)
+
+        self.proxies = ["{}:{}".format(*server.server_address) for server in self.servers[1:]]
+
+        self.fixtures = {name: load(name) for name in
+                         (RESULTS_PAGE, EBAY_ITEM, IFRAME_DESC, PROXY_LIST)}
+
+    def __create_server(self) -> ThreadingHTTPServer:
+        """Creates a server bound to a free local port"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        server.daemon_threads = True
+        server.stand_in = self
+
+        return server
+
+    def __enter__(self) -> "StandIn":
+        for server in self.servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        return self
+
+    def __exit__(self, *args) -> None:
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def count(self, route: str) -> None:
+        """Counts a request"""
+        with self.lock:
+            self.requests[route] += 1
+
+    def delay(self) -> float:
+        """Draws the latency of a response"""
+        with self.lock:
+            return self.latency + self.random.uniform(0, self.jitter)
+
+    def fails(self) -> bool:
+        """Draws whether a response fails"""
+        with self.lock:
+            return self.random.random() < self.failure_rate
+
+    @lru_cache(maxsize=None)
+    def results_page(self, page: int) -> str:
+        """Renders a results page linking to stand-in ebay items unique to the page"""
+        html = NUM_PAGES_REGEX.sub(f'data-num-pages="{self.pages}"', self.fixtures[RESULTS_PAGE])
+
+        return ITEM_LINK_REGEX.sub(lambda match: f"{self.base_url}/itm/{page}-{match.group(1)}", html)
+
+    def ebay_item(self, item: str) -> str:
+        """Renders an ebay item page pointing to a stand-in description"""
+        return IFRAME_SRC_REGEX.sub(f"{self.base_url}/desc/{item}", self.fixtures[EBAY_ITEM])
+
+    def iframe_desc(self) -> str:
+        """Renders an ebay item description"""
+        return self.fixtures[IFRAME_DESC]
+
+    def proxy_list(self) -> str:
+        """Renders a proxy list holding the stand-in proxies"""
+        rows = "".join("<tr><td>{}</td><td>{}</td></tr>".format(*proxy.split(":"))
+                       for proxy in self.proxies)
+
+        return TABLE_BODY_REGEX.sub(lambda _: f"<tbody>{rows}</tbody>", self.fixtures[PROXY_LIST])
@@ -1,17 +1,25 @@
-import json
+import os
+import re
+import glob
 import random
+import itertools
+import argparse
+from functools import partial
 import threading
-from queue import Queue
+from queue import Queue, Empty
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Iterable, Optional
 
-import requests
-import pandas as pd
-from bs4 import BeautifulSoup
-from requests import Response
-from fake_useragent import UserAgent
+if TYPE_CHECKING:
+    from requests import Response
 
-from utils import Logger, ProxyHandler
+from utils import (Logger, METRICS, Reporting, HtmlExtractor, ProxyHandler, ResponseCache, 
+                   CachedResponse, Fetcher, FetchError, RecordSink, WorkJournal, 
+                   AtomicCounter, DescriptionIndex, read_journals, write_dataset)
+from utils.dataset import iter_table, table_columns
+from utils.work_journal import FETCHED, PARSED, FAILED, position_key
+from utils.metrics import add_arguments
 
 HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
@@ -27,202 +35,562 @@ HEADERS = {
 
 OUTPUT_PATH = "./cleaned/"
 
-class CleanExcelData:
-    """Cleans the data in excel"""
+INPUT_PATH = "./data/results/"
+
+CLEANED_DATASET = "./cleaned/results/"
+
+SLUG_COLUMNS = {"Year": "YEAR", "Make": "MAKE", "Model": "MODEL", "Hours": "HOURS"}
+
+REQUIRED_COLUMNS = ("YEAR", "MAKE", "MODEL", "HOURS")
+
+SUSPECT_PATTERNS = {"YEAR": re.compile(r"(19[4-9]\d|20\d\d)(\.0)?"),
+                    "HOURS": re.compile(r"[\d,]+(\.\d+)?")}
+
+USER_AGENT_POOL_SIZE = 50
+
+WORK_BATCH_SIZE = 1000
+
+_user_agents: list[str] = []
+_user_agents_lock = threading.Lock()
+
+
+def random_user_agent() -> str:
+    """Picks a user agent from a pool loaded once per process, on the first request"""
+    with _user_agents_lock:
+        if not _user_agents:
+            from fake_useragent import UserAgent
+
+            user_agent = UserAgent()
+
+            _user_agents.extend({user_agent.random.strip() for _ in range(USER_AGENT_POOL_SIZE)})
+
+    return random.choice(_user_agents)
+
+
+def get_filename() -> str:
+    """Gets a journal name that doesn't overwrite earlier runs of the day"""
+    filename, run = f"cleaned_data_{date.today()}", 1
+
+    while glob.glob(f"{OUTPUT_PATH}{filename}.*"):
+        run += 1
+
+        filename = f"cleaned_data_{date.today()}_{run}"
+
+    return filename
+
+
+def configure_ssl() -> None:
+    """Lets requests talk to hosts with legacy ciphers, without certificate warnings"""
+    import requests
+
     requests.packages.urllib3.disable_warnings()
 
     requests.packages.urllib3.util.ssl_.DEFAULT_CIPHERS = 'ALL:@SECLEVEL=1'
 
-    def __init__(self) -> None:
+
+class CleanExcelData:
+    """Cleans the data in excel"""
+    def __init__(self, 
+                 offline: bool=False, 
+                 shard: Optional[tuple[int, int]]=None, 
+                 thread_num: int=100,
+                 input_path: Optional[str]=INPUT_PATH,
+                 start: Optional[str]=None,
+                 end: Optional[str]=None,
+                 excel: bool=False,
+                 required: tuple[str, ...]=REQUIRED_COLUMNS,
+                 rate: Optional[float]=None,
+                 cleaned_dataset: str=CLEANED_DATASET,
+                 run_key: Optional[str]=None,
+                 columns: Optional[list[str]]=None,
+                 queue_size: int=2 * WORK_BATCH_SIZE,
+                 output: Optional[Queue]=None,
+                 name: Optional[str]=None) -> None:
         self.logger = Logger(__class__.__name__)
         self.logger.info("*****Data Cleaner Started*****")
 
-        self.queue = Queue()
-        self.thread_num = 100
+        self.queue = Queue(queue_size)
+        self.output = output
+        self.shard = shard
+        self.thread_num = thread_num
+        self.extractor = HtmlExtractor()
 
-        self.cleaned = []
-        self.json_data = []
+        self.done = AtomicCounter()
         self.bad_proxies = set()
-        self.uncleaned = self.__read_excel()
 
-    def __read_excel(self) -> pd.DataFrame:
-        """Retrives uncleaned data from excel"""
-        return pd.read_excel("./data/results_2023-09-08.xlsx")
+        self.proxy_handler = ProxyHandler(self.bad_proxies)
 
-    def __fetch_page(self, url: str) -> Response:
-        """Retrieves a page from ebay"""
-        while True:
-            while not len(self.proxies):pass
-
-            ip_prort = random.choice(self.proxies)
+        self.fetcher = Fetcher(HEADERS, 
+                               retries=50,
+                               max_backoff=10,
+                               rate=rate,
+                               cache=ResponseCache(offline=offline), 
+                               proxy_pool=None if offline else self.proxy_handler,
+                               user_agent=random_user_agent,
+                               accept=(404,),
+                               verify=False)
+        self.input_path = input_path
+        self.excel = excel
+        self.required = required
+        self.cleaned_dataset = cleaned_dataset
+        self.start = start
+        self.end = end
+        self.descriptions = DescriptionIndex()
 
-            proxy = {"https":f"http://{ip_prort}"}
+        if input_path is not None:
+            columns = columns or table_columns(input_path)
 
-            try:
-                
+        suffix = "" if shard is None else ".shard{}of{}".format(*shard)
 
-                HEADERS["User-Agent"] = UserAgent().random.strip()
+        key = run_key or os.path.abspath(input_path)
 
-                response =  requests.get(
-                    url, headers=HEADERS, timeout=10, proxies=proxy, verify=False)
+        if start or end:
+            key += "[{}:{}]".format(start or "", end or "")
 
-                if response.ok or response.status_code == 404:
-                    return response
-                
-                # print(response.status_code)
+        self.journal = WorkJournal()
+        self.run_state = self.journal.open_run(
+            "clean", key + suffix, f"{OUTPUT_PATH}{name or get_filename()}{suffix}.jsonl")
 
-            except: 
-                try:
-                    if len(set(self.proxies)) > 20:
-                        self.proxies.remove(ip_prort)
+        self.sink = RecordSink(self.run_state.output, 
+                               columns=columns, 
+                               append=self.run_state.resumed)
+        self.rejected = RecordSink(f"{os.path.splitext(self.run_state.output)[0]}.rejected.jsonl", 
+                                   append=self.run_state.resumed)
 
-                        self.bad_proxies.add(ip_prort)
+        self.name = os.path.splitext(os.path.basename(self.run_state.output))[0]
 
-                except:pass
+    def __fetch_page(self, url: str) -> Optional["Response|CachedResponse"]:
+        """Retrieves a page from ebay"""
+        try:
+            return self.fetcher.fetch(url)
+        
+        except FetchError as e:
+            self.logger.warn(str(e))
 
-    def __get_iframe_source(self, response: Response) -> Optional[str]:
+    def __get_iframe_source(self, response: "Response") -> Optional[str]:
         """Gets an iframe source from the response object"""
         try:
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            return soup.select_one("iframe#desc_ifr")["src"]
+            with METRICS.time("parse", kind="ebay_item"):
+                return self.extractor.extract_iframe_source(response.text)
         
         except:pass
 
-    def __extract_item_slugs(self, response: Response) -> Optional[dict[str, str]]:
+    def __extract_item_slugs(self, response: "Response") -> Optional[dict[str, str]]:
         """Extracts item slugs from the response object"""
-        equipement = {}
-            
         try:
-            soup = BeautifulSoup(response.text, "html.parser")
+            with METRICS.time("parse", kind="iframe"):
+                return self.extractor.extract_item_slugs(response.text)
+        
+        except:
+            return {}
 
-            container = soup.select_one("div.container")
+    def __create_work(self) -> None:
+        """Journals and hands out the input batch by batch, skipping items finished by an earlier session"""
+        self.queue_len, journaled = 0, set()
 
-            unordered_list = container.select_one("ul.list-group")
+        if self.run_state.resumed:
+            self.logger.info("Resuming run {}: {}".format(
+                self.run_state.id, self.journal.counts(self.run_state)))
 
-            for list_item in unordered_list.select("li"):
-                try:
-                    key, value = list_item.get_text(strip=True).split(":")
+            journaled = self.journal.positions(self.run_state)
 
-                    equipement[key.strip()] = value.strip()
-                except:
-                    pass
-        except:pass
-            
-        return equipement
+            for item in self.journal.unfinished(self.run_state):
+                self.queue_len += 1
+
+                self.queue.put(item)
+
+        work = enumerate(iter_table(self.input_path, self.start, self.end))
+
+        if self.shard is not None:
+            shard, shards = self.shard
+
+            work = ((index, item) for index, item in work if index % shards == shard)
+
+        work = ((index, item) for index, item in work if index not in journaled)
+
+        while batch := list(itertools.islice(work, WORK_BATCH_SIZE)):
+            self.journal.add_many(self.run_state, batch)
+
+            self.queue_len += len(batch)
+
+            [self.queue.put(item) for item in batch]
+
+        self.queue.join()
+
+    def __stream_work(self, stream: Iterable[tuple[Any, dict[str, Any]]]) -> None:
+        """Hands work to threads as it arrives from an earlier stage, skipping items already journaled"""
+        self.queue_len, journaled = 0, set()
+
+        if self.run_state.resumed:
+            self.logger.info("Resuming run {}: {}".format(
+                self.run_state.id, self.journal.counts(self.run_state)))
+
+            journaled = self.journal.positions(self.run_state)
+
+            for item in self.journal.unfinished(self.run_state):
+                self.queue_len += 1
 
-    def __create_work(self, excel_data: pd.DataFrame) -> None:
-        """Creates work to be done by threads"""
-        equipements = excel_data.to_dict("records")
+                self.queue.put(item)
 
-        self.queue_len = len(equipements)
+        for position, item in stream:
+            if position_key(position) in journaled:
+                continue
 
-        [self.queue.put(item) for item in equipements]
+            journaled.add(position_key(position))
+
+            self.journal.add_many(self.run_state, [(position, item)])
+
+            self.queue_len += 1
+
+            self.queue.put((position, item))
 
         self.queue.join()
 
+    def __start_threads(self) -> None:
+        """Starts the worker and proxy threads"""
+        self.threads = [threading.Thread(target=self.__work) for _ in range(self.thread_num)]
+
+        if self.fetcher.proxy_pool is not None:
+            self.threads.extend(threading.Thread(target=target) for target in 
+                                (self.proxy_handler.get_proxies, 
+                                 self.proxy_handler.validate_proxies))
+
+        [thread.start() for thread in self.threads]
+
+    def __stop_threads(self) -> None:
+        """Drops pending work and stops all threads once they finish their current item"""
+        while True:
+            try:
+                self.queue.get_nowait()
+
+                self.queue.task_done()
+            
+            except Empty:
+                break
+
+        [self.queue.put(None) for _ in range(self.thread_num)]
+
+        self.proxy_handler.stop()
+
+        [thread.join() for thread in self.threads]
+
     def __work(self) -> None:
         """Work to be done by threads"""
         while True:
-            item = self.queue.get()
+            work = self.queue.get()
+
+            if work is None:
+                self.queue.task_done()
 
-            response = self.__fetch_page(item["LINK TO LISTING"])
+                break
 
-            iframe_url = self.__get_iframe_source(response)
+            index, item = work
 
-            if iframe_url is not None:
-                response = self.__fetch_page(iframe_url)
+            try:
+                state, record = self.__clean_item(index, item)
 
-                equipement = self.__extract_item_slugs(response)
+                with METRICS.time("reconcile"):
+                    self.__emit(index, record, state)
 
-                cleaned_item = {**item, 
-                                "YEAR": equipement.get("Year", ""),
-                                "MAKE": equipement.get("Make", ""),
-                                "MODEL": equipement.get("Model", ""),
-                                "HOURS": equipement.get("Hours", "")}
-                
-                if len(equipement):
-                    self.cleaned.append(cleaned_item)
-                else:
-                    self.cleaned.append(item)
+                METRICS.increment("items_total", state=state)
 
-                    self.json_data.append(item)
+            except Exception:
+                self.__fail(index, item)
 
-                    with open("rejected.json", "w") as f:
-                        json.dump(self.json_data, f, indent=False)
+            finally:
+                done = self.done.increment()
 
-            else:
-                self.cleaned.append(item)
+                args = (self.queue_len - done, done)
 
-            if len(self.cleaned) % 10 == 0:
-                try:
-                    self.__save_to_csv()
-                except:pass
+                self.logger.progress("Queue: {} || Crawled: {}", *args)
 
-            args = (self.queue_len - len(self.cleaned), len(self.cleaned))
+                self.queue.task_done()
 
-            self.logger.info("Queue: {} || Crawled: {}".format(*args))
+    def __fail(self, index: Any, item: dict[str, Any]) -> None:
+        """Records an item that hit an unexpected error as failed, so the run carries on"""
+        self.logger.error("Couldn't clean item {} ({})".format(index, item.get("LINK TO LISTING")))
 
-            self.queue.task_done()
+        try:
+            self.journal.mark(self.run_state, index, FAILED, error="unexpected")
+
+        except Exception:
+            self.logger.error("Couldn't journal the failure of item {}".format(index))
+
+        METRICS.increment("items_total", state=FAILED)
+
+    def __needs_enrichment(self, item: dict[str, Any]) -> bool:
+        """Checks whether any required field of an item is missing or suspect"""
+        for column in self.required:
+            value = str(item.get(column) or "").strip()
+
+            if value.lower() in ("", "nan", "none", "<na>"):
+                return True
+
+            if column in SUSPECT_PATTERNS and not SUSPECT_PATTERNS[column].fullmatch(value):
+                return True
+
+        return False
+
+    def __get_description_url(self, index: int, link: str) -> tuple[str, Optional[str]]:
+        """Gets the description iframe url of a listing, from the index or its ebay page"""
+        known, iframe_url = self.descriptions.get_iframe(link)
+
+        if known:
+            METRICS.increment("description_index_total", lookup="iframe", result="hit")
+
+            return PARSED, iframe_url
+
+        METRICS.increment("description_index_total", lookup="iframe", result="miss")
+
+        response = self.__fetch_page(link)
+
+        if response is None:
+            return FAILED, None
+
+        self.journal.mark(self.run_state, index, FETCHED)
+
+        iframe_url = self.__get_iframe_source(response)
+
+        if iframe_url is not None or response.status_code == 404:
+            self.descriptions.add_iframe(link, iframe_url)
+        else:
+            self.fetcher.cache.discard(link)
+
+        return PARSED, iframe_url
+
+    def __get_description_fields(self, iframe_url: str) -> Optional[dict[str, str]]:
+        """Gets the fields of a description, from the index or the description page"""
+        fields = self.descriptions.get_fields(iframe_url)
+
+        if fields is not None:
+            METRICS.increment("description_index_total", lookup="fields", result="hit")
+
+            return fields
+
+        METRICS.increment("description_index_total", lookup="fields", result="miss")
+
+        response = self.__fetch_page(iframe_url)
+
+        if response is None:
+            return
+
+        fields = self.__extract_item_slugs(response)
+
+        if fields:
+            self.descriptions.add_fields(iframe_url, fields)
+        else:
+            self.fetcher.cache.discard(iframe_url)
+
+        return fields
+
+    def __emit(self, index: Any, item: dict[str, Any], state: str) -> None:
+        """Journals an item, advancing its state once it is durable, and hands it to the next stage"""
+        self.sink.write(index, item, done=partial(self.journal.mark, self.run_state, index, state))
+
+        if self.output is not None:
+            self.output.put((index, item))
+
+    def __clean_item(self, index: int, item: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+        """Cleans an item with its ebay description when it needs it, returning its work state and record"""
+        if not self.__needs_enrichment(item):
+            METRICS.increment("enrichment_total", result="skipped")
+
+            return PARSED, item
+
+        link = item.get("LINK TO LISTING")
+
+        if not isinstance(link, str) or not link.strip():
+            METRICS.increment("enrichment_total", result="no_link")
+
+            return PARSED, item
+
+        state, iframe_url = self.__get_description_url(index, link)
+
+        if iframe_url is None:
+            return state, item
+
+        equipement = self.__get_description_fields(iframe_url)
+
+        if equipement is None:
+            return FAILED, item
+
+        cleaned_item = {**item, **{column: equipement[slug] for slug, column in SLUG_COLUMNS.items() 
+                                   if equipement.get(slug)}}
+
+        if len(equipement):
+            METRICS.increment("enrichment_total", result="enriched")
+
+            return PARSED, cleaned_item
+
+        METRICS.increment("enrichment_total", result="rejected")
+
+        self.rejected.write(index, item)
+
+        return PARSED, item
     
-    def __order_results(self) -> list[dict[str, str]]:
-        """Sorts the data in the correct order"""
-        items = self.cleaned
+    def saved_records(self) -> list[tuple[Any, dict[str, Any]]]:
+        """Reads the records saved by earlier sessions of a resumed run, leaving out items it retries"""
+        if not self.run_state.resumed:
+            return []
 
-        ordered_list = []
+        retried = {position_key(position) for position, _ in self.journal.unfinished(self.run_state)}
 
-        for ordered_item in self.uncleaned_list:
-            previous_item = (ordered_item["SALE DATE"], 
-                             ordered_item["BIDADOO PRICE"],
-                             ordered_item["LINK TO LISTING"])
-            
-            for unordered_item in items:
-                if previous_item == (unordered_item["SALE DATE"],
-                                     unordered_item["BIDADOO PRICE"],
-                                     unordered_item["LINK TO LISTING"]):
-                    ordered_list.append(unordered_item)
+        return [(position, record) for position, record in self.sink.read() 
+                if position_key(position) not in retried]
 
-                    break
-        
-        return ordered_list
+    def __save(self) -> None:
+        """Exports the journaled items in the order of the uncleaned data"""
+        self.logger.info("Saving data retrieved...")
 
-    def __save_to_csv(self) -> None:
-        """Save items to csv"""
-        self.logger.info("Saving data retrieved to excel...")
+        with METRICS.time("save"):
+            self.sink.close()
+            self.rejected.close()
 
-        ordered_data = self.__order_results()
+            records = self.sink.export_parquet(self.cleaned_dataset, self.name)
 
-        df = pd.DataFrame(ordered_data).drop_duplicates()
+        self.logger.info("{} records saved to {}".format(records, self.cleaned_dataset))
 
-        filename = f"cleaned_data_{date.today()}.xlsx"
+        if self.excel:
+            with METRICS.time("save", kind="excel"):
+                self.sink.export_excel(f"{OUTPUT_PATH}{self.name}.xlsx")
 
-        df.to_excel(f"{OUTPUT_PATH}{filename}", index=False)
+            self.logger.info("Excel view saved to {}.xlsx".format(self.name))
 
-        self.logger.info("{} records saved to {}".format(len(df), filename))
+    def run(self, stream: Optional[Iterable[tuple[Any, dict[str, Any]]]]=None) -> None:
+        """Entry point to the cleaner, cleaning the input table or a stream of positioned items"""
+        if not self.fetcher.cache.offline:
+            configure_ssl()
 
-    def run(self) -> None:
-        """Entry point to the cleaner"""
-        [threading.Thread(target=self.__work, 
-                          daemon=True).start() for _ in range(self.thread_num)]
-        
-        proxy_handler = ProxyHandler(self.bad_proxies)
+        self.__start_threads()
 
-        [threading.Thread(target=proxy_handler.get_proxies, 
-                          daemon=True).start() for _ in range(1)]
+        try:
+            if self.fetcher.proxy_pool is not None:
+                self.proxy_handler.wait_ready()
+            
+            if stream is None:
+                self.__create_work()
+            else:
+                self.__stream_work(stream)
         
-        self.proxies = proxy_handler.proxies
+        except KeyboardInterrupt:
+            self.logger.warn("Interrupted. Waiting for threads to finish...")
 
-        while not len(self.proxies):pass
-        
-        self.uncleaned_list = self.uncleaned.to_dict("records")
+        finally:
+            self.__stop_threads()
+
+        if self.shard is None:
+            self.__save()
+        else:
+            self.sink.close()
+            self.rejected.close()
+
+        self.logger.info("Stages: {}".format(METRICS.summary()))
+
+        counts = self.journal.counts(self.run_state)
+
+        if self.journal.is_done(self.run_state):
+            self.journal.finish(self.run_state)
+
+            self.logger.info("Finished! {}".format(counts))
+        else:
+            self.logger.warn("Unfinished items: {}. Run again to retry them.".format(counts))
+
+
+def clean_shard(shard: int, 
+                shards: int, 
+                metrics_snapshot: Optional[str]=None, 
+                metrics_interval: float=10, 
+                **options) -> str:
+    """Cleans a shard of the data in a worker process, returning its journal path"""
+    snapshot = f"{metrics_snapshot}.shard{shard}" if metrics_snapshot else None
+
+    reporting = Reporting(snapshot=snapshot, interval=metrics_interval)
+
+    try:
+        cleaner = CleanExcelData(shard=(shard, shards), **options)
+        cleaner.run()
+    
+    finally:
+        reporting.stop()
+
+    return cleaner.sink.path
+
+def clean_sharded(processes: int, 
+                  excel: bool=False, 
+                  metrics_snapshot: Optional[str]=None, 
+                  metrics_interval: float=10, 
+                  **options) -> None:
+    """Cleans the data in worker processes and merges their output in the original order"""
+    logger = Logger("CleanExcelData")
+
+    with ProcessPoolExecutor(processes) as executor:
+        shard = partial(clean_shard, 
+                        shards=processes, 
+                        metrics_snapshot=metrics_snapshot, 
+                        metrics_interval=metrics_interval, 
+                        name=get_filename(),
+                        **options)
         
-        self.__create_work(self.uncleaned)
+        paths = list(executor.map(shard, range(processes)))
+
+    logger.info("Merging {} shards...".format(processes))
+
+    with METRICS.time("save"):
+        df = read_journals(paths)
+
+        name = os.path.basename(paths[0]).split(".shard")[0]
 
-        self.__save_to_csv()
+        write_dataset(df, CLEANED_DATASET, name)
 
-        self.logger.info("Finished!")
+    logger.info("{} records saved to {}".format(len(df), CLEANED_DATASET))
+
+    if excel:
+        df.to_excel(f"{OUTPUT_PATH}{name}.xlsx", index=False)
+
+        logger.info("Excel view saved to {}.xlsx".format(name))
 
 
 if __name__ == "__main__":
-    cleaner = CleanExcelData()
-    cleaner.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Cleans the scraped equipements")
+
+    parser.add_argument("--offline", action="store_true", 
+                        help="replay pages from the response cache")
+    parser.add_argument("--processes", type=int, default=1, 
+                        help="number of worker processes, each cleaning a shard of the rows")
+    parser.add_argument("--threads", type=int, default=100, 
+                        help="number of threads per process")
+    parser.add_argument("--rate", type=float, 
+                        help="maximum requests per second to each host, per process")
+    parser.add_argument("--input", default=INPUT_PATH, 
+                        help="results dataset directory, or an excel, csv or parquet file")
+    parser.add_argument("--start", help="first sale date (YYYY-MM-DD) to clean from a dataset")
+    parser.add_argument("--end", help="last sale date (YYYY-MM-DD) to clean from a dataset")
+    parser.add_argument("--excel", action="store_true", 
+                        help="also export the cleaned data to excel")
+    parser.add_argument("--require", nargs="+", default=REQUIRED_COLUMNS, 
+                        choices=REQUIRED_COLUMNS, 
+                        help="columns whose missing or suspect values trigger an ebay lookup")
+    
+    add_arguments(parser)
+
+    args = parser.parse_args()
+
+    options = dict(offline=args.offline, thread_num=args.threads, input_path=args.input, 
+                   start=args.start, end=args.end, required=tuple(args.require), 
+                   rate=args.rate)
+
+    reporting = Reporting.from_args(args)
+
+    try:
+        if args.processes > 1:
+            clean_sharded(args.processes, 
+                          excel=args.excel, 
+                          metrics_snapshot=args.metrics_snapshot, 
+                          metrics_interval=args.metrics_interval, 
+                          **options)
+        else:
+            cleaner = CleanExcelData(excel=args.excel, **options)
+            cleaner.run()
+    
+    finally:
+        reporting.stop()
\ No newline at end of file
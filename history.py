@@ -0,0 +1,60 @@
+import argparse
+from typing import Any, Optional
+
+from main import RESULTS_DATASET
+from utils import Logger, ListingHistory
+
+
+def show(rows: list[dict[str, Any]], output: Optional[str]) -> None:
+    """Prints rows as a table, or writes them to a csv or excel file"""
+    import pandas as pd
+
+    df = pd.DataFrame(rows)
+
+    if output is None:
+        print(df.to_string(index=False) if len(df) else "No rows")
+    elif output.endswith(".csv"):
+        df.to_csv(output, index=False)
+    else:
+        df.to_excel(output, index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Queries the price history of scraped listings")
+    parser.add_argument("-o", "--output", help="write the rows to a csv or excel file")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imports = commands.add_parser("import", help="record the runs of the results dataset")
+    imports.add_argument("--root", default=RESULTS_DATASET, help="results dataset directory")
+
+    changes = commands.add_parser("changes", help="listings new or repriced in a run")
+    changes.add_argument("--run", help="run name like results_2023-09-08, the latest by default")
+
+    prices = commands.add_parser("prices", help="price history of a make or make and model")
+    prices.add_argument("make")
+    prices.add_argument("model", nargs="?")
+
+    commands.add_parser("runs", help="list the recorded runs")
+
+    args = parser.parse_args()
+
+    history = ListingHistory()
+
+    if args.command == "import":
+        runs = history.import_dataset(args.root)
+
+        Logger("History").info("{} runs imported from {}".format(runs, args.root))
+
+    elif args.command == "changes":
+        show(history.changes(args.run), args.output)
+
+    elif args.command == "prices":
+        show(history.price_history(args.make, args.model), args.output)
+
+    else:
+        show([{"run": run} for run in history.runs()], args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import os
+import glob
+import argparse
+
+from utils import Logger, read_table, write_dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Converts result workbooks to a parquet dataset")
+    parser.add_argument("inputs", nargs="+", help="excel files or glob patterns")
+    parser.add_argument("--root", default="./data/results/", help="dataset directory")
+
+    args = parser.parse_args()
+
+    logger = Logger("ImportResults")
+
+    for path in sorted({path for pattern in args.inputs for path in glob.glob(pattern)}):
+        name = os.path.splitext(os.path.basename(path))[0]
+
+        records = write_dataset(read_table(path), args.root, name)
+
+        logger.info("{} records imported from {}".format(records, path))
+
+
+if __name__ == "__main__":
+    main()
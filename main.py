@@ -1,17 +1,24 @@
+import os
 import re
-import json
+import glob
+import argparse
+import asyncio
 import threading
 from queue import Queue
+from collections import deque
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
-from typing import Optional
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator, NamedTuple, Optional
 
-import requests
-import pandas as pd
-from requests import Response
-from bs4 import BeautifulSoup
+if TYPE_CHECKING:
+    import aiohttp
 
-from utils import Logger
+from utils import (Logger, METRICS, Reporting, HtmlExtractor, EbayModelExtractor, ExtractionError, 
+                   ResponseCache, ListingIndex, Fetcher, FetchError, RecordSink, 
+                   WorkJournal, AtomicCounter, ListingHistory)
+from utils.work_journal import FETCHED, PARSED, FAILED, position_key
+from utils.metrics import add_arguments
 
 HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
@@ -31,217 +38,638 @@ EQUIPEMENT = dict[str, str|dict[str, str|list[dict[str, str]]]]
 
 OUTPUT_PATH = "./data/"
 
-@dataclass
-class Equipement:
-    data_dict: EQUIPEMENT
+RESULTS_DATASET = "./data/results/"
 
-    def __post_init__(self) -> None:
-        self.price = self.data_dict["price"]
-        self.date = self.data_dict["date"]
-        self.link = self.data_dict["link"]
+COLUMNS = ["YEAR", "MAKE", "MODEL", "HOURS", "BIDADOO PRICE", 
+           "SALE DATE", "PREVIOUS  OWNER", "LINK TO LISTING"]
 
-        try:
-            self.year = self.data_dict["modelYear"]["values"][0]["textSpans"][0]["text"]
-        except:
-            try:
-                self.year = re.search(r"\d{4,}", self.data_dict["desc"]).group()
-            except:
-                self.year = ""
-        
-        index = 1 if self.year.strip() else 0
-        
-        try:
-            self.make = self.data_dict["make"]["values"][0]["textSpans"][0]["text"]
-        except:
-            self.make = self.data_dict["desc"].split(" ")[index]
-        
-        try:
-            self.model = self.data_dict["model"]["values"][0]["textSpans"][0]["text"]
-        except:
-            self.model = self.data_dict["desc"].split(" ")[index + 1]
+RESULTS_TTL = 0
 
-        try:
-            self.hours = self.data_dict["hours"]["values"][0]["textSpans"][0]["text"]
-        except:
-            self.hours = ""
+DETAILS_TTL = None
+
+FEATURE_NAMES = {"year": "modelYear", "make": "make", "model": "model", "hours": "hours"}
+
+FEATURE_TEXT_PATH = ("values", 0, "textSpans", 0, "text")
+
+YEAR_REGEX = re.compile(r"\d{4,}")
+
+def get_feature(features: EQUIPEMENT, name: str) -> Optional[str]:
+    """Gets the text of an ebay item feature, or None when the listing doesn't have it"""
+    value = features.get(name)
+
+    try:
+        for key in FEATURE_TEXT_PATH:
+            value = value[key]
+
+    except (KeyError, IndexError, TypeError):
+        return
+
+    return value if isinstance(value, str) else None
+
+class Equipement(NamedTuple):
+    """Final fields of a captured equipement"""
+    year: str
+    make: str
+    model: str
+    hours: str
+    price: str
+    date: str
+    link: str
+
+    @classmethod
+    def from_features(cls, features: EQUIPEMENT, item: dict[str, str]) -> "Equipement":
+        """Builds an equipement from its ebay features, falling back to the bidadoo description"""
+        fields = {field: get_feature(features, name) for field, name in FEATURE_NAMES.items()}
+
+        desc = item.get("desc") or ""
+
+        if fields["year"] is None:
+            match = YEAR_REGEX.search(desc)
+
+            fields["year"] = match.group() if match else ""
+
+        index = 1 if fields["year"].strip() else 0
+
+        tokens = desc.split(" ")
 
-    def __repr__(self) -> str:
-        return str(f"Equipement(year={self.year}, make={self.make}, model={self.model}, "
-                   f"hours={self.hours}, bidadoo_price={self.price}, "
-                   f"sale_date={self.date})")
+        if fields["make"] is None:
+            fields["make"] = tokens[index]
+
+        if fields["model"] is None:
+            fields["model"] = tokens[index + 1]
+
+        if fields["hours"] is None:
+            fields["hours"] = ""
+
+        return cls(price=item["price"], date=item["date"], link=item["link"], **fields)
+
+    def to_record(self) -> dict[str, str]:
+        """Converts the equipement to an output record"""
+        return {"YEAR": self.year,
+                "MAKE": self.make,
+                "MODEL": self.model, 
+                "HOURS": self.hours, 
+                "BIDADOO PRICE": self.price,
+                "SALE DATE": self.date, 
+                "PREVIOUS  OWNER": "",
+                "LINK TO LISTING": self.link}
 
 class BidadooScraper:
     """Scrapes equipements https://www.bidadoo.com/results"""
-    def __init__(self) -> None:
+    def __init__(self, 
+                 offline: bool=False, 
+                 incremental: bool=True, 
+                 excel: bool=False,
+                 thread_num: int=10,
+                 concurrency: int=50,
+                 listing_threads: int=20,
+                 rate: Optional[float]=None,
+                 results_dataset: str=RESULTS_DATASET,
+                 output: Optional[Queue]=None) -> None:
         self.logger = Logger(__class__.__name__)
         self.logger.info("*****Bidadoo Scraper Started*****")
 
-        self.crawled = []
-        self.equipments = []
+        self.rate = rate
+        self.thread_num = thread_num
+        self.concurrency = concurrency
+        self.listing_window = 5
+        self.listing_threads = listing_threads
+        self.results_dataset = results_dataset
+        self.output = output
+
+        self.fetcher = Fetcher(HEADERS, cache=ResponseCache(offline=offline), 
+                               rate=self.rate, pool_size=self.concurrency)
+
+        self.incremental = incremental
+        self.index = ListingIndex()
+
+        files = self.index.import_results(f"{OUTPUT_PATH}results_*.xlsx", 
+                                          f"{results_dataset}*/*.parquet")
+
+        args = (len(self.index), files)
+
+        self.logger.info("Known listings: {} ({} result files imported)".format(*args))
+
+        self.journal = WorkJournal()
+        self.run_state = self.journal.open_run("scrape", f"results_{date.today()}", 
+                                                self.__get_filename())
+
+        self.name = os.path.splitext(self.run_state.output)[0]
+
+        self.history = ListingHistory()
+
+        runs = self.history.import_dataset(results_dataset)
+
+        if runs:
+            self.logger.info("Price history: {} earlier runs imported".format(runs))
+
+        self.history.start_run(self.name)
+
+        self.excel = excel
+
+        self.sink = RecordSink(f"{OUTPUT_PATH}{self.name}.jsonl", columns=COLUMNS)
+
+        self.crawled = AtomicCounter()
+        self.queue_len = AtomicCounter()
+        self.errors = RecordSink(f"{OUTPUT_PATH}errors.jsonl")
 
         self.queue = Queue()
-        self.regex = re.compile(r"\[\]\)\.concat\((.*)\)</script></body>")
+        self.extractor = HtmlExtractor()
+        self.model_extractor = EbayModelExtractor()
 
-        self.thread_num = 10
         self.base_url = "https://www.bidadoo.com/results"
     
-    def __fetch_page(self, url: str, params: Optional[dict[str, str]]=None) -> Response:
-        """Fetches a webpage from a given link"""
-        for _ in range(10):
-            try:
-                response = requests.get(url, params=params, headers=HEADERS, timeout=10)
+    def __get_filename(self) -> str:
+        """Gets a results name that doesn't overwrite earlier runs of the day"""
+        filename, run = f"results_{date.today()}", 1
+
+        while glob.glob(f"{OUTPUT_PATH}{filename}.*"):
+            run += 1
+
+            filename = f"results_{date.today()}_{run}"
+        
+        return filename
+
+    def __extract_bidadoo_items(self, html: str) -> tuple[list[dict[str, str]], int]:
+        """Extracts bidadoo equipements and the number of pages from the results page html"""
+        with METRICS.time("parse", kind="results"):
+            equipements, total_pages = self.extractor.extract_results(html)
+        
+        self.logger.info("Equipements found: {}".format(len(equipements)))
+
+        return equipements, total_pages
+
+    def __extract_ebay_slugs(self, html: Optional[str]) -> EQUIPEMENT:
+        """Extract ebay slugs from the ebay item page html"""
+        ebay_slugs, _ = self.model_extractor.extract(html)
 
-                if response.ok:
-                    return response
+        return ebay_slugs
+
+    def __create_record(self, 
+                        item: dict[str, str], 
+                        html: Optional[str]) -> Optional[dict[str, str]]:
+        """Creates an output record for an item from its ebay page html"""
+        with METRICS.time("parse", kind="ebay_item"):
+            try:
+                features = self.__extract_ebay_slugs(html)
             
-            except:pass
+            except ExtractionError:
+                features = {}
 
-            self.logger.warn("Couldn't retrieve item from {}. Retrying...".format(url))
+        try:
+            return Equipement.from_features(features, item).to_record()
 
-    def __extract_bidadoo_items(self, response: Response) -> list[dict[str, str]]:
-        """Extracts bidadoo equipements from the response"""
-        soup = BeautifulSoup(response.text, "html.parser")
+        except (KeyError, IndexError):
+            self.logger.error("Couldn't create record for {}".format(item["link"]))
 
-        results = soup.find("div", {"class": "results"})
+            self.errors.write(item["link"], item)
 
-        equipements = []
+    def __filter_known(self, page: int, equipements: list[dict[str, str]]) -> list[dict[str, str]]:
+        """Drops equipements captured by previous runs, stopping at pages with only known ones"""
+        if not self.incremental:
+            return equipements
 
-        for equipement in results.select("div.category__ct"):
-            price = equipement.select_one("div.category__txt > p")
-            link_tag = equipement.select_one("a.category__butt")
-            description = equipement.select_one("div.category__head")
+        with METRICS.time("reconcile"):
+            new_equipements = [equipement for equipement in equipements 
+                               if (equipement["link"], equipement["price"], 
+                                   equipement["date"]) not in self.index]
+        
+        args = (len(equipements) - len(new_equipements), page)
 
-            equipements.append({"desc": description.get_text(strip=True),
-                                "price": price.get_text(strip=True),
-                                "link": link_tag["href"],
-                                "date": link_tag.get_text(strip=True).split(" ")[-1]})
+        self.logger.info("Known equipements skipped: {} on page {}".format(*args))
         
-        self.logger.info("Equipements found: {}".format(len(equipements)))
+        if len(equipements) and not len(new_equipements):
+            if page <= self.resume_page:
+                self.logger.info("Page {} was planned by an earlier session. Carrying on...".format(page))
+            else:
+                self.logger.info("Page {} holds only known equipements. Stopping...".format(page))
+
+                self.stop_page = min(self.stop_page, page)
+
+        return new_equipements
+
+    def __drop_duplicates(self, equipements: list[dict[str, str]]) -> list[dict[str, str]]:
+        """Drops equipements already listed on an earlier results page of the run"""
+        new_equipements = []
+
+        for equipement in equipements:
+            if equipement["link"] not in self.seen_links:
+                self.seen_links.add(equipement["link"])
+
+                new_equipements.append(equipement)
+
+        return new_equipements
+
+    def __plan_work(self, page: int, equipements: list[dict[str, str]]) -> list[tuple]:
+        """Journals the new equipements of a results page as work"""
+        equipements = self.__drop_duplicates(self.__filter_known(page, equipements))
+
+        return self.__add_work(page, equipements)
+
+    def __index_record(self, record: dict[str, str]) -> None:
+        """Adds a captured record to the listing index"""
+        self.index.add(record["LINK TO LISTING"], 
+                       record["BIDADOO PRICE"], 
+                       record["SALE DATE"])
+
+    def __add_work(self, page: int, equipements: list[dict[str, str]]) -> list[tuple]:
+        """Records the equipements of a page in the work journal, returning them with positions"""
+        work = [((self.run_state.session, page, index), item) 
+                for index, item in enumerate(equipements)]
+        
+        self.journal.add_many(self.run_state, work)
 
-        return equipements
+        return work
 
-    def __extract_ebay_slugs(self, response: Response) -> EQUIPEMENT:
-        """Extract ebay slugs from the response object"""
-        json_str = self.regex.search(response.text).group(1)
+    def __get_unfinished_work(self) -> list[tuple]:
+        """Gets the equipements an earlier session of the run didn't finish
 
-        json_data = json.loads(json_str)["o"]["w"][0][2]["model"]["modules"]
+        Pages planned by earlier sessions hold only known equipements once
+        those are saved, so paging doesn't stop before the last of them.
+        """
+        self.seen_links, self.resume_page = set(), 0
 
-        return json_data["ABOUT_THIS_ITEM"]["sections"]["features"]["dataItems"]
+        if not self.run_state.resumed:
+            return []
+
+        self.resume_page = max((page for _, page, _ in self.journal.positions(self.run_state)), default=0)
+
+        work = self.journal.unfinished(self.run_state)
+
+        self.seen_links.update(item["link"] for _, item in work)
+
+        self.logger.info("Resuming run {}: {} (pages planned: {})".format(
+            self.run_state.id, self.journal.counts(self.run_state), self.resume_page))
+
+        return work
+
+    def __confirm_record(self, position: list[int], record: dict[str, str], state: str) -> None:
+        """Indexes a record and advances its item once the record is durable"""
+        self.__index_record(record)
+
+        self.history.record(self.name, record)
+
+        self.journal.mark(self.run_state, position, state)
+
+    def __store_record(self, 
+                       position: list[int], 
+                       item: dict[str, str], 
+                       html: Optional[str]) -> Optional[dict[str, str]]:
+        """Creates and journals the record of an item, confirming it once it is saved"""
+        record = self.__create_record(item, html)
+
+        state = PARSED if html is not None else FAILED
+
+        with METRICS.time("reconcile"):
+            if record is not None:
+                self.sink.write(position, record, 
+                                done=partial(self.__confirm_record, position, record, state))
+
+                self.crawled.increment()
+            else:
+                self.journal.mark(self.run_state, position, state)
+
+        METRICS.increment("items_total", state=state)
+
+        return record
+
+    def saved_records(self) -> list[tuple]:
+        """Reads the records saved by earlier sessions of a resumed run, leaving out items it retries"""
+        if not self.run_state.resumed:
+            return []
+
+        retried = {position_key(position) for position, _ in self.journal.unfinished(self.run_state)}
+
+        return [(position, record) for position, record in self.sink.read() 
+                if position_key(position) not in retried]
+
+    def __fail(self, position: list[int], item: dict[str, str]) -> None:
+        """Records an item that hit an unexpected error as failed, so the run carries on"""
+        self.logger.error("Couldn't process {}".format(item.get("link")))
+
+        self.errors.write(item.get("link"), item)
+
+        try:
+            self.journal.mark(self.run_state, position, FAILED, error="unexpected")
+
+        except Exception:
+            self.logger.error("Couldn't journal the failure of {}".format(item.get("link")))
+
+        METRICS.increment("items_total", state=FAILED)
+
+    def __finish_run(self) -> None:
+        """Marks the run as finished unless some items can still be retried"""
+        counts = self.journal.counts(self.run_state)
+
+        if self.journal.is_done(self.run_state):
+            self.journal.finish(self.run_state)
+
+            if counts.get(FAILED):
+                self.logger.warn("Gave up on {} failed items, kept with their fallback records".format(
+                    counts[FAILED]))
+        else:
+            self.logger.warn("Unfinished items: {}. Run again to retry them.".format(counts))
 
     def __work(self) -> None:
         """Work to be done by threads"""
         while True:
-            item = self.queue.get()
+            position, item = self.queue.get()
 
-            # if item["link"] in self.crawled:
-            #     self.queue.task_done()
+            try:
+                try:
+                    html = self.fetcher.fetch(item["link"], ttl=DETAILS_TTL).text
 
-            #     continue
+                    self.journal.mark(self.run_state, position, FETCHED)
+                
+                except FetchError as e:
+                    self.logger.warn(str(e))
 
-            try:
-                response = self.__fetch_page(item["link"])
+                    html = None
 
-                ebay_slugs = self.__extract_ebay_slugs(response)
+                record = self.__store_record(position, item, html)
 
-                equipement = Equipement({**ebay_slugs, **item})
+                if record is not None:
+                    if self.output is not None:
+                        self.output.put((position, record))
 
-                self.page_results.append({"YEAR": equipement.year,
-                                          "MAKE": equipement.make,
-                                          "MODEL": equipement.model, 
-                                          "HOURS": equipement.hours, 
-                                          "BIDADOO PRICE": equipement.price,
-                                          "SALE DATE": equipement.date, 
-                                          "PREVIOUS  OWNER": "",
-                                          "LINK TO LISTING": equipement.link})
-                
-                self.queue_len -= 1
+                    args = (self.queue_len.increment(-1), self.crawled.value)
+                    
+                    self.logger.progress("Queue: {} || Crawled: {}", *args)
 
-                self.crawled.append(equipement.link)
+            except Exception:
+                self.__fail(position, item)
 
-                args = (self.queue_len, len(self.crawled))
-                
-                self.logger.info("Queue: {} || Crawled: {}".format(*args))
-            
-            except: 
-                try:
-                    try:
-                        year = re.search(r"\d{4,}", item["desc"]).group()
-                    except:
-                        year = ""
-
-                    self.page_results.append({"YEAR": year,
-                                              "MAKE": item["desc"].split(" ")[1],
-                                              "MODEL": item["desc"].split(" ")[2], 
-                                              "HOURS": "", 
-                                              "BIDADOO PRICE": item["price"],
-                                              "SALE DATE": item["date"], 
-                                              "PREVIOUS  OWNER": "",
-                                              "LINK TO LISTING": item["link"]})
-                except:
-                    self.logger.error()
-
-                    with open("error.json", "w") as f:
-                        json.dump(item, f, indent=4)
-            
-            self.queue.task_done()
+            finally:
+                self.queue.task_done()
+
+    def __checkpoint(self) -> None:
+        """Makes the records journaled so far durable"""
+        self.sink.flush()
+
+        self.logger.info("Checkpoint: {} records journaled to {}".format(
+            self.crawled.value, self.sink.path))
+
+    def __save(self) -> None:
+        """Exports the journaled records to the results dataset, and to excel if asked"""
+        self.logger.info("Saving data retrieved...")
 
-    def __save_to_csv(self) -> None:
-        """Save data retrieved to csv"""
-        self.logger.info("Saving data retrieved to excel...")
+        with METRICS.time("save"):
+            self.sink.close()
+            self.errors.close()
 
-        df = pd.DataFrame(self.equipments).drop_duplicates()
+            records = self.sink.export_parquet(self.results_dataset, self.name)
 
-        filename = f"results_{date.today()}.xlsx"
+        self.logger.info("{} records saved to {}".format(records, self.results_dataset))
 
-        df.to_excel(f"{OUTPUT_PATH}{filename}", index=False)
+        if self.excel:
+            with METRICS.time("save", kind="excel"):
+                self.sink.export_excel(f"{OUTPUT_PATH}{self.name}.xlsx")
 
-        self.logger.info("{} records saved to {}".format(len(df), filename))
+            self.logger.info("Excel view saved to {}.xlsx".format(self.name))
+
+        self.logger.info("Ebay page layouts: {}".format(dict(self.model_extractor.layouts)))
+
+        self.logger.info("Stages: {}".format(METRICS.summary()))
+
+    def __get_params(self, page: int) -> dict[str, str]:
+        """Gets the query of a results page"""
+        return {**PARAMS, "pageNumber": str(page)}
+
+    def __fetch_listing(self, page: int) -> Optional[str]:
+        """Fetches a results page, returning None when it can't be retrieved"""
+        self.logger.info("Fetching equipements from page: {}".format(page))
+
+        try:
+            return self.fetcher.fetch(self.base_url, 
+                                      params=self.__get_params(page), 
+                                      ttl=RESULTS_TTL).text
+        
+        except FetchError as e:
+            self.logger.error("Skipping results page {}: {}".format(page, e))
+
+    def __prefetch_listings(self, total_pages: int) -> Iterator[tuple[int, Optional[str]]]:
+        """Fetches results pages concurrently, yielding them in page order
+        
+        Incremental runs keep a small window of pages in flight, so paging 
+        stops soon after the first page holding only known equipements.
+        """
+        window = self.listing_window if self.incremental else self.listing_threads
+
+        pages = iter(range(2, total_pages + 1))
+
+        with ThreadPoolExecutor(window) as executor:
+            in_flight = deque()
+
+            for page in range(window):
+                page = next(pages, None)
+
+                if page is not None and page <= self.stop_page:
+                    in_flight.append((page, executor.submit(self.__fetch_listing, page)))
+
+            while in_flight:
+                page, future = in_flight.popleft()
+
+                if page > self.stop_page:
+                    break
+
+                yield page, future.result()
+
+                page = next(pages, None)
+
+                if page is not None and page <= self.stop_page:
+                    in_flight.append((page, executor.submit(self.__fetch_listing, page)))
+
+            for _, future in in_flight:
+                future.cancel()
+
+    def __enqueue(self, work: list[tuple]) -> None:
+        """Hands work to the detail threads"""
+        self.queue_len.increment(len(work))
+
+        [self.queue.put(item) for item in work]
 
     def scrape(self) -> None:
         """Entry point to the scraper"""
-        page = 1
+        self.stop_page = float("inf")
+
         [threading.Thread(target=self.__work, 
                           daemon=True).start() for _ in range(self.thread_num)]
 
-        while True:
-            self.logger.info("Fetching equipements from page: {}".format(page))
+        self.__enqueue(self.__get_unfinished_work())
 
-            self.page_results = []
+        self.logger.info("Fetching equipements from page: 1")
 
-            PARAMS["pageNumber"] = str(page)
+        html = self.fetcher.fetch(self.base_url, params=self.__get_params(1), ttl=RESULTS_TTL).text
 
-            params = PARAMS
+        equipements, total_pages = self.__extract_bidadoo_items(html)
 
-            if page == 1:
-                params = None
+        self.logger.info("Total pages: {}".format(total_pages))
 
-            response = self.__fetch_page(self.base_url, params=params)
+        self.__enqueue(self.__plan_work(1, equipements))
 
-            equipements = self.__extract_bidadoo_items(response)
+        for page, html in self.__prefetch_listings(total_pages):
+            if html is not None:
+                equipements, _ = self.__extract_bidadoo_items(html)
 
-            self.queue_len = len(equipements)
+                self.__enqueue(self.__plan_work(page, equipements))
 
-            [self.queue.put(equipement) for equipement in equipements]
-            self.queue.join()
+        self.queue.join()
 
-            for item in equipements:
-                for equipment in self.page_results:
-                    if item["link"] == equipment["LINK TO LISTING"] \
-                        and item["price"] == equipment["BIDADOO PRICE"] \
-                            and item["date"] == equipment["SALE DATE"]:
-                        self.equipments.append(equipment)
+        self.__checkpoint()
 
-            soup = BeautifulSoup(response.text, "html.parser")
+        self.__save()
 
-            total_pages = soup.select_one("div.results")["data-num-pages"]
+        self.__finish_run()
+
+    async def __crawl_detail(self, 
+                             session: "aiohttp.ClientSession", 
+                             position: list[int], 
+                             item: dict[str, str]) -> None:
+        """Fetches and parses an ebay detail page"""
+        try:
+            try:
+                html = await self.fetcher.fetch_async(session, item["link"], ttl=DETAILS_TTL, 
+                                                      semaphore=self.semaphore)
+
+                self.journal.mark(self.run_state, position, FETCHED)
             
-            self.__save_to_csv()
+            except FetchError as e:
+                self.logger.warn(str(e))
+
+                html = None
+
+            record = self.__store_record(position, item, html)
+
+            if record is not None:
+                if self.output is not None:
+                    await asyncio.to_thread(self.output.put, (position, record))
+
+                args = (len(self.pending), self.crawled.value)
+
+                self.logger.progress("Queue: {} || Crawled: {}", *args)
+
+        except Exception:
+            self.__fail(position, item)
+
+    async def __crawl_listing(self, session: "aiohttp.ClientSession", page: int) -> None:
+        """Fetches a results page and schedules its detail pages"""
+        try:
+            if page > self.stop_page:
+                return
+
+            self.logger.info("Fetching equipements from page: {}".format(page))
+
+            html = await self.fetcher.fetch_async(session, self.base_url, 
+                                                  params=self.__get_params(page), 
+                                                  ttl=RESULTS_TTL, semaphore=self.semaphore)
+        
+        except FetchError as e:
+            self.logger.error("Skipping results page {}: {}".format(page, e))
+
+            return
+
+        finally:
+            self.listing_slots.release()
+
+        equipements, _ = self.__extract_bidadoo_items(html)
+
+        for position, item in self.__plan_work(page, equipements):
+            self.__schedule(self.__crawl_detail(session, position, item))
+
+    def __schedule(self, coroutine) -> None:
+        """Schedules a coroutine, keeping track of it until it finishes"""
+        task = asyncio.create_task(coroutine)
+
+        self.pending.add(task)
+
+        task.add_done_callback(self.pending.discard)
 
-            if page >= int(total_pages):
-                break
+    async def __crawl(self) -> None:
+        """Crawls listing and detail pages concurrently"""
+        import aiohttp
 
-            page += 1
+        self.pending = set()
+        self.stop_page = float("inf")
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.listing_slots = asyncio.Semaphore(
+            self.listing_window if self.incremental else self.concurrency)
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.fetcher.timeout)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            for position, item in self.__get_unfinished_work():
+                self.__schedule(self.__crawl_detail(session, position, item))
+
+            self.logger.info("Fetching equipements from page: 1")
+
+            html = await self.fetcher.fetch_async(session, self.base_url, 
+                                                  params=self.__get_params(1), 
+                                                  ttl=RESULTS_TTL, semaphore=self.semaphore)
+
+            equipements, total_pages = self.__extract_bidadoo_items(html)
+
+            self.logger.info("Total pages: {}".format(total_pages))
+
+            for position, item in self.__plan_work(1, equipements):
+                self.__schedule(self.__crawl_detail(session, position, item))
+
+            for page in range(2, total_pages + 1):
+                await self.listing_slots.acquire()
+
+                if page > self.stop_page:
+                    self.listing_slots.release()
+
+                    break
+
+                self.__schedule(self.__crawl_listing(session, page))
+
+            while self.pending:
+                await asyncio.gather(*self.pending)
+
+    def scrape_async(self) -> None:
+        """Entry point to the asyncio scraper"""
+        asyncio.run(self.__crawl())
+
+        self.__save()
+
+        self.__finish_run()
 
 if __name__ == "__main__":
-    scraper = BidadooScraper()
-    scraper.scrape()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrapes equipements from bidadoo")
+
+    parser.add_argument("--offline", action="store_true", 
+                        help="replay pages from the response cache")
+    parser.add_argument("--full", action="store_true", 
+                        help="scrape the whole catalogue instead of new listings only")
+    parser.add_argument("--excel", action="store_true", 
+                        help="also export the results to excel")
+    parser.add_argument("--threads", type=int, default=10, 
+                        help="detail threads of the threaded engine")
+    parser.add_argument("--concurrency", type=int, default=50, 
+                        help="connections of the asyncio engine")
+    parser.add_argument("--rate", type=float, 
+                        help="maximum requests per second to each host")
+    parser.add_argument("--engine", choices=["async", "threads"], default="async")
+    
+    add_arguments(parser)
+
+    args = parser.parse_args()
+
+    reporting = Reporting.from_args(args)
+
+    try:
+        scraper = BidadooScraper(offline=args.offline, 
+                                 incremental=not args.full, 
+                                 excel=args.excel,
+                                 thread_num=args.threads,
+                                 concurrency=args.concurrency,
+                                 rate=args.rate)
+        
+        if args.engine == "async":
+            scraper.scrape_async()
+        else:
+            scraper.scrape()
+    
+    finally:
+        reporting.stop()
\ No newline at end of file
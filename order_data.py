@@ -1,24 +1,34 @@
-import pandas as pd
+import argparse
+from datetime import date
 
-df = pd.read_excel("./cleaned_data_2023-09-10.xlsx")
+from utils import Logger, normalize, read_tables
+from utils.normalize import MIN_YEAR
 
 
-df_wrong = df[(df["YEAR"] < 1940) | (df["YEAR"] > 2023)]
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Normalizes cleaned equipements")
+    parser.add_argument("inputs", nargs="+", help="excel, csv or parquet files or glob patterns")
+    parser.add_argument("-o", "--output", default="./cleaned/cleaned_{}.xlsx".format(date.today()))
+    parser.add_argument("--min-year", type=int, default=MIN_YEAR)
+    parser.add_argument("--max-year", type=int, default=date.today().year)
 
-print(df_wrong)
+    args = parser.parse_args()
 
-df.fillna("", inplace=True)
+    logger = Logger("OrderData")
 
-df_wrong["YEAR"] = ""
+    df = read_tables(args.inputs)
 
-df.update(df_wrong)
+    normalized = normalize(df, args.min_year, args.max_year)
 
-# defined = df[~(df["YEAR"] == None) & ~(df["YEAR"] == "")].astype("int")
+    logger.info("Rows: {} || Without year: {} || Duplicates dropped: {}".format(
+        len(normalized),
+        int(normalized["YEAR"].isna().sum()) if "YEAR" in normalized else 0,
+        len(df) - len(normalized)))
 
-# df.update(defined)
+    normalized.to_excel(args.output, index=False)
 
-df["YEAR"] = df["YEAR"].astype("str")
+    logger.info("Saved to {}".format(args.output))
 
-df["YEAR"] = [value.replace(".0", "") for value in df["YEAR"]]
 
-df.to_excel("./cleaned/cleaned_2023-09-10.xlsx", index=False)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import os
+import glob
+import argparse
+import itertools
+import threading
+from queue import Queue
+from datetime import date
+from typing import Any, Callable, Optional
+
+from main import BidadooScraper, COLUMNS, RESULTS_DATASET
+from clean_data import CleanExcelData, CLEANED_DATASET, INPUT_PATH, REQUIRED_COLUMNS
+from utils import Logger, Reporting, normalize, normalize_records, read_table, write_dataset
+from utils.metrics import add_arguments
+from utils.normalize import MIN_YEAR
+
+STAGES = ["scrape", "enrich", "normalize"]
+
+NORMALIZED_DATASET = "./cleaned/normalized/"
+
+
+def get_filename(root: str) -> str:
+    """Gets a normalized dataset name that doesn't overwrite earlier runs of the day"""
+    filename, run = f"normalized_{date.today()}", 1
+
+    while glob.glob(os.path.join(root, "*", f"{filename}.parquet")):
+        run += 1
+
+        filename = f"normalized_{date.today()}_{run}"
+
+    return filename
+
+
+def drain(queue: Queue) -> None:
+    """Consumes a queue up to its end marker, so a failed stage doesn't block the one before it"""
+    for _ in iter(queue.get, None):
+        pass
+
+
+class Pipeline:
+    """Chains scrape -> enrich -> normalize through bounded in-memory queues
+
+    A resumed stage only streams the items it retries, so the stage after it
+    first reads the records its earlier sessions saved.
+    """
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+
+        self.logger = Logger(__class__.__name__)
+
+        self.threads: list[threading.Thread] = []
+        self.errors: list[BaseException] = []
+
+        self.saved: list[tuple[Any, dict[str, Any]]] = []
+
+    def __start(self, name: str, target: Callable[[], None], output: Optional[Queue]) -> None:
+        """Runs a stage in a thread, closing its output queue when it ends"""
+        def run() -> None:
+            try:
+                target()
+
+            except BaseException as e:
+                self.logger.error("Stage {} failed".format(name))
+
+                self.errors.append(e)
+
+            finally:
+                if output is not None:
+                    output.put(None)
+
+        thread = threading.Thread(target=run, name=name)
+        thread.start()
+
+        self.threads.append(thread)
+
+    def __scrape(self, output: Optional[Queue]) -> BidadooScraper:
+        """Starts the scrape stage"""
+        args = self.args
+
+        scraper = BidadooScraper(offline=args.offline,
+                                 incremental=not args.full,
+                                 excel=args.excel,
+                                 thread_num=args.threads,
+                                 concurrency=args.concurrency,
+                                 listing_threads=args.listing_threads,
+                                 rate=args.rate,
+                                 results_dataset=args.results_dataset,
+                                 output=output)
+
+        self.saved = scraper.saved_records()
+
+        target = scraper.scrape_async if args.engine == "async" else scraper.scrape
+
+        self.__start("scrape", target, output)
+
+        return scraper
+
+    def __enrich(self,
+                 source: Optional[Queue],
+                 output: Optional[Queue],
+                 run_key: Optional[str]) -> CleanExcelData:
+        """Starts the enrich stage, reading the previous stage or the input"""
+        args = self.args
+
+        cleaner = CleanExcelData(offline=args.offline,
+                                 thread_num=args.clean_threads,
+                                 input_path=None if source is not None else args.input,
+                                 start=args.start,
+                                 end=args.end,
+                                 excel=args.excel,
+                                 required=tuple(args.require),
+                                 rate=args.clean_rate,
+                                 cleaned_dataset=args.cleaned_dataset,
+                                 run_key=run_key,
+                                 columns=COLUMNS if source is not None else None,
+                                 queue_size=args.queue_size,
+                                 output=output)
+
+        saved, self.saved = self.saved, cleaner.saved_records()
+
+        def enrich() -> None:
+            try:
+                cleaner.run(None if source is None else itertools.chain(saved, iter(source.get, None)))
+
+            except BaseException:
+                if source is not None:
+                    drain(source)
+
+                raise
+
+        self.__start("enrich", enrich, output)
+
+        return cleaner
+
+    def __normalize(self, source: Optional[Queue], name: str) -> None:
+        """Runs the normalize stage on the previous stage or the input, naming its files after the run"""
+        args = self.args
+
+        if source is None:
+            normalized = normalize(read_table(args.input, start=args.start, end=args.end),
+                                   args.min_year, args.max_year)
+        else:
+            records = itertools.chain(self.saved, iter(source.get, None))
+
+            normalized = normalize_records(records, args.min_year, args.max_year)
+
+        if normalized.empty:
+            self.logger.warn("Nothing to normalize")
+
+            return
+
+        records = write_dataset(normalized, args.output, name)
+
+        self.logger.info("{} normalized records saved to {}".format(records, args.output))
+
+        if args.excel:
+            normalized.to_excel(os.path.join(args.output, f"{name}.xlsx"), index=False)
+
+    def run(self) -> None:
+        """Runs the selected stages, each streaming into the next"""
+        stages = [stage for stage in STAGES if stage in self.args.stages]
+
+        self.logger.info("Stages: {}".format(" -> ".join(stages)))
+
+        def queue_after(stage: str) -> Optional[Queue]:
+            """Creates the queue feeding the stages after a stage, if any"""
+            if stages.index(stage) + 1 < len(stages):
+                return Queue(self.args.queue_size)
+
+        source, run_key, name = None, None, None
+
+        if "scrape" in stages:
+            source = queue_after("scrape")
+
+            scraper = self.__scrape(source)
+
+            run_key = "pipeline:{}".format(scraper.name)
+
+            name = scraper.name
+
+        if "enrich" in stages:
+            output = queue_after("enrich")
+
+            cleaner = self.__enrich(source, output, run_key)
+
+            name = name or cleaner.name
+
+            source = output
+
+        if "normalize" in stages:
+            try:
+                self.__normalize(source, name or get_filename(self.args.output))
+
+            except BaseException:
+                if source is not None:
+                    drain(source)
+
+                raise
+
+        [thread.join() for thread in self.threads]
+
+        if self.errors:
+            raise self.errors[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scrapes, enriches and normalizes equipements")
+
+    parser.add_argument("--stages", nargs="+", default=STAGES,
+                        help="stages to run, any of {}".format(", ".join(STAGES)))
+    parser.add_argument("--input", default=INPUT_PATH,
+                        help="input of the first stage when it isn't scrape")
+    parser.add_argument("--start", help="first sale date (YYYY-MM-DD) read from the input")
+    parser.add_argument("--end", help="last sale date (YYYY-MM-DD) read from the input")
+    parser.add_argument("--output", default=NORMALIZED_DATASET, help="normalized dataset directory")
+    parser.add_argument("--results-dataset", default=RESULTS_DATASET)
+    parser.add_argument("--cleaned-dataset", default=CLEANED_DATASET)
+    parser.add_argument("--excel", action="store_true", help="also export every stage to excel")
+
+    parser.add_argument("--offline", action="store_true", help="replay pages from the response cache")
+    parser.add_argument("--full", action="store_true", help="scrape the whole catalogue")
+    parser.add_argument("--engine", choices=["async", "threads"], default="async")
+    parser.add_argument("--threads", type=int, default=10, help="scraper detail threads")
+    parser.add_argument("--concurrency", type=int, default=50, help="scraper asyncio connections")
+    parser.add_argument("--listing-threads", type=int, default=20,
+                        help="results pages fetched at once by a full threaded scrape")
+    parser.add_argument("--rate", type=float, help="scraper requests per second to each host")
+    parser.add_argument("--clean-threads", type=int, default=100, help="enrichment threads")
+    parser.add_argument("--clean-rate", type=float, help="enrichment requests per second to each host")
+    parser.add_argument("--queue-size", type=int, default=1000, help="items buffered between stages")
+    parser.add_argument("--require", nargs="+", default=REQUIRED_COLUMNS, choices=REQUIRED_COLUMNS,
+                        help="columns whose missing or suspect values trigger an ebay lookup")
+    parser.add_argument("--min-year", type=int, default=MIN_YEAR)
+    parser.add_argument("--max-year", type=int, default=date.today().year)
+
+    add_arguments(parser)
+
+    args = parser.parse_args()
+
+    for stage in set(args.stages) - set(STAGES):
+        parser.error(f"unknown stage: {stage}")
+
+    reporting = Reporting.from_args(args)
+
+    try:
+        Pipeline(args).run()
+
+    finally:
+        reporting.stop()
+
+
+if __name__ == "__main__":
+    main()
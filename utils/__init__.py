@@ -1,2 +1,14 @@
 from .logger import Logger
-from .proxy_handler import ProxyHandler
\ No newline at end of file
+from .metrics import METRICS, PROFILER, Metrics, Reporting
+from .cache import ResponseCache, CachedResponse
+from .fetcher import Fetcher, FetchError, RateLimiter
+from .sink import RecordSink, read_journals
+from .counters import AtomicCounter
+from .work_journal import WorkJournal, Run
+from .listing_index import ListingIndex
+from .description_index import DescriptionIndex
+from .extractors import HtmlExtractor, EbayModelExtractor, ExtractionError
+from .proxy_handler import ProxyHandler, ProxyPoolClosed, ProxyPoolExhausted
+from .dataset import write_dataset, load_dataset, read_table, read_tables
+from .normalize import normalize, normalize_records
+from .history import ListingHistory
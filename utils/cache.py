@@ -0,0 +1,192 @@
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional, Mapping
+from urllib.parse import urlencode
+
+from .sqlite_store import SqliteStore
+
+CACHE_PATH = "./cache/responses.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def cache_key(url: str, params: Optional[Mapping[str, str]] = None) -> str:
+    """Builds the cache key of a request from its url and query params"""
+    if not params:
+        return url
+
+    return "{}{}{}".format(url, "&" if "?" in url else "?", urlencode(params))
+
+
+@dataclass
+class CachedResponse:
+    """A response replayed from the cache"""
+    url: str
+    status_code: int
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def is_fresh(self, ttl: Optional[float]) -> bool:
+        """Checks whether the response can be used without revalidation"""
+        return ttl is None or time.time() - self.fetched_at < ttl
+
+
+class ResponseCache(SqliteStore):
+    """Persists responses in a compressed sqlite store keyed by url"""
+    schema = SCHEMA
+
+    def __init__(self,
+                 path: str = CACHE_PATH,
+                 max_size: int = 2 * 1024 ** 3,
+                 max_age: float = 30 * 24 * 3600,
+                 offline: bool = False) -> None:
+        super().__init__(path)
+
+        self.max_size = max_size
+        self.max_age = max_age
+        self.offline = offline
+
+        self.size = 0
+
+        self.evict()
+
+    def get(self, url: str, params: Optional[Mapping[str, str]] = None) -> Optional[CachedResponse]:
+        """Retrieves a cached response"""
+        key = cache_key(url, params)
+
+        connection = self.connect()
+
+        row = connection.execute(
+            "SELECT status, body, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+            (key,)).fetchone()
+
+        if row is None:
+            return
+
+        connection.execute(
+            "UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), key))
+
+        status, body, etag, last_modified, fetched_at = row
+
+        return CachedResponse(key, status, zlib.decompress(body).decode("utf-8"),
+                              etag, last_modified, fetched_at)
+
+    def validators(self, cached: Optional[CachedResponse]) -> dict[str, str]:
+        """Builds the conditional request headers for revalidating a cached response"""
+        headers = {}
+
+        if cached is None:
+            return headers
+
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+        return headers
+
+    def put(self,
+            url: str,
+            status: int,
+            text: str,
+            headers: Mapping[str, str],
+            params: Optional[Mapping[str, str]] = None) -> None:
+        """Stores a response"""
+        key = cache_key(url, params)
+
+        body = zlib.compress(text.encode("utf-8"), 6)
+
+        now = time.time()
+
+        connection = self.connect()
+
+        with self.lock:
+            previous = connection.execute(
+                "SELECT size FROM responses WHERE url = ?", (key,)).fetchone()
+
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, status, body, headers.get("ETag"), headers.get("Last-Modified"),
+                 now, now, len(body)))
+
+            self.size += len(body) - (previous[0] if previous else 0)
+
+        if self.size > self.max_size:
+            self.evict()
+
+    def discard(self, url: str, params: Optional[Mapping[str, str]] = None) -> None:
+        """Drops a cached response that turned out to be unusable, so it is fetched again"""
+        if self.offline:
+            return
+
+        key = cache_key(url, params)
+
+        connection = self.connect()
+
+        with self.lock:
+            row = connection.execute("SELECT size FROM responses WHERE url = ?", (key,)).fetchone()
+
+            if row is not None:
+                connection.execute("DELETE FROM responses WHERE url = ?", (key,))
+
+                self.size -= row[0]
+
+    def refresh(self, cached: CachedResponse) -> CachedResponse:
+        """Marks a cached response as revalidated after a 304 Not Modified"""
+        cached.fetched_at = time.time()
+
+        self.connect().execute(
+            "UPDATE responses SET fetched_at = ? WHERE url = ?", (cached.fetched_at, cached.url))
+
+        return cached
+
+    def evict(self) -> None:
+        """Drops entries unused for the max age, then the least recently used over the max size"""
+        connection = self.connect()
+
+        with self.lock:
+            connection.execute(
+                "DELETE FROM responses WHERE accessed_at < ?", (time.time() - self.max_age,))
+
+            self.size = connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+            if self.size <= self.max_size:
+                return
+
+            target = self.max_size * 0.9
+
+            rows = connection.execute(
+                "SELECT url, size FROM responses ORDER BY accessed_at").fetchall()
+
+            evicted = []
+
+            for url, size in rows:
+                if self.size <= target:
+                    break
+
+                evicted.append((url,))
+
+                self.size -= size
+
+            connection.executemany("DELETE FROM responses WHERE url = ?", evicted)
@@ -0,0 +1,16 @@
+import threading
+
+
+class AtomicCounter:
+    """Counter that can be updated from many threads without losing updates"""
+    def __init__(self, value: int = 0) -> None:
+        self.value = value
+
+        self.lock = threading.Lock()
+
+    def increment(self, amount: int = 1) -> int:
+        """Adds to the counter, returning the new value"""
+        with self.lock:
+            self.value += amount
+
+            return self.value
@@ -0,0 +1,167 @@
+import os
+import glob
+from datetime import date
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PARTITION = "sale_date"
+UNKNOWN = "unknown"
+
+DATE_COLUMN = "SALE DATE"
+
+
+def partition_keys(dates: "pd.Series") -> "pd.Series":
+    """Maps sale dates like "9/7/2023" to ISO partition keys"""
+    import pandas as pd
+
+    parsed = pd.to_datetime(dates, errors="coerce", format="mixed")
+
+    return parsed.dt.strftime("%Y-%m-%d").fillna(UNKNOWN)
+
+
+def write_dataset(df: "pd.DataFrame",
+                  root: str,
+                  name: str,
+                  date_column: str = DATE_COLUMN) -> int:
+    """Writes records as parquet files partitioned by sale date, returning how many were written
+
+    Each run writes one `<root>/sale_date=<date>/<name>.parquet` file per
+    date, so rewriting a run replaces its files without touching others.
+    """
+    import pandas as pd
+
+    df = df.astype({column: "string" for column in df.columns if df[column].dtype == object})
+
+    for key, partition in df.groupby(partition_keys(df[date_column]), sort=True):
+        directory = os.path.join(root, f"{PARTITION}={key}")
+
+        os.makedirs(directory, exist_ok=True)
+
+        path = os.path.join(directory, f"{name}.parquet")
+
+        partition.to_parquet(f"{path}.tmp", index=False)
+
+        os.replace(f"{path}.tmp", path)
+
+    return len(df)
+
+
+def dataset_files(root: str,
+                  start: Optional[str|date] = None,
+                  end: Optional[str|date] = None) -> list[str]:
+    """Lists the parquet files of the sale dates between start and end, inclusive"""
+    start = str(start) if start else None
+    end = str(end) if end else None
+
+    paths = []
+
+    for directory in sorted(glob.glob(os.path.join(root, f"{PARTITION}=*"))):
+        key = directory.rsplit("=", 1)[1]
+
+        if key == UNKNOWN and (start or end):
+            continue
+
+        if (start and key < start) or (end and key > end):
+            continue
+
+        paths.extend(sorted(glob.glob(os.path.join(directory, "*.parquet"))))
+
+    return paths
+
+
+def load_dataset(root: str,
+                 columns: Optional[list[str]] = None,
+                 start: Optional[str|date] = None,
+                 end: Optional[str|date] = None) -> "pd.DataFrame":
+    """Loads the selected columns of the records sold between start and end"""
+    import pandas as pd
+
+    frames = [pd.read_parquet(path, columns=columns) for path in dataset_files(root, start, end)]
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_table(path: str,
+               columns: Optional[list[str]] = None,
+               start: Optional[str|date] = None,
+               end: Optional[str|date] = None) -> "pd.DataFrame":
+    """Reads a parquet dataset between two sale dates, or an excel, csv or parquet file"""
+    import pandas as pd
+
+    if os.path.isdir(path):
+        return load_dataset(path, columns, start, end)
+
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+
+    if path.endswith(".csv"):
+        return pd.read_csv(path, usecols=columns, dtype=str)
+
+    return pd.read_excel(path, usecols=columns, dtype=str)
+
+
+def table_columns(path: str) -> list[str]:
+    """Gets the columns of a dataset or file without reading its rows"""
+    import pandas as pd
+
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        columns = {}
+
+        for file in dataset_files(path) if os.path.isdir(path) else [path]:
+            columns.update(dict.fromkeys(pq.read_schema(file).names))
+
+        return list(columns)
+
+    if path.endswith(".csv"):
+        return list(pd.read_csv(path, nrows=0).columns)
+
+    return list(pd.read_excel(path, nrows=0).columns)
+
+
+def iter_table(path: str,
+               start: Optional[str|date] = None,
+               end: Optional[str|date] = None,
+               batch_size: int = 1000) -> Iterator[dict[str, Any]]:
+    """Streams the records of a dataset or file in order, with None for missing values
+
+    Parquet and csv inputs are read batch by batch, so the first records are
+    available without loading the whole table.
+    """
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for file in dataset_files(path, start, end) if os.path.isdir(path) else [path]:
+            for batch in pq.ParquetFile(file).iter_batches(batch_size):
+                yield from batch.to_pylist()
+
+        return
+
+    import pandas as pd
+
+    if path.endswith(".csv"):
+        chunks = pd.read_csv(path, dtype=str, chunksize=batch_size)
+    else:
+        chunks = [pd.read_excel(path, dtype=str)]
+
+    for chunk in chunks:
+        yield from chunk.astype(object).where(chunk.notna(), None).to_dict("records")
+
+
+def read_tables(patterns: list[str]) -> "pd.DataFrame":
+    """Reads and concatenates every file or dataset matching the patterns"""
+    import pandas as pd
+
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+
+    if not paths:
+        raise FileNotFoundError("No files match {}".format(", ".join(patterns)))
+
+    return pd.concat([read_table(path) for path in paths], ignore_index=True)
+
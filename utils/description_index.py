@@ -0,0 +1,62 @@
+import re
+import json
+import time
+from typing import Optional
+
+from .sqlite_store import SqliteStore
+
+INDEX_PATH = "./cache/descriptions.sqlite3"
+
+ITEM_ID_REGEX = re.compile(r"/itm/(?:[^/?#]+/)?(\d+)(?=[/?#]|$)")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS iframes (
+    item TEXT PRIMARY KEY,
+    url TEXT,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS descriptions (
+    url TEXT PRIMARY KEY,
+    fields TEXT NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def item_id(link: str) -> str:
+    """Gets the ebay item id of a listing link, or the link itself"""
+    match = ITEM_ID_REGEX.search(link)
+
+    return match.group(1) if match else link
+
+
+class DescriptionIndex(SqliteStore):
+    """Persistent item id -> description iframe url -> parsed fields lookups"""
+    schema = SCHEMA
+
+    def __init__(self, path: str = INDEX_PATH) -> None:
+        super().__init__(path)
+
+    def get_iframe(self, link: str) -> tuple[bool, Optional[str]]:
+        """Gets whether the iframe of a listing is known, and its url (None when it has none)"""
+        row = self.connect().execute(
+            "SELECT url FROM iframes WHERE item = ?", (item_id(link),)).fetchone()
+
+        return (False, None) if row is None else (True, row[0])
+
+    def add_iframe(self, link: str, url: Optional[str]) -> None:
+        """Remembers the iframe url of a listing"""
+        self.connect().execute("INSERT OR REPLACE INTO iframes VALUES (?, ?, ?)",
+                               (item_id(link), url, time.time()))
+
+    def get_fields(self, url: str) -> Optional[dict[str, str]]:
+        """Gets the parsed fields of a description, or None when it wasn't parsed yet"""
+        row = self.connect().execute(
+            "SELECT fields FROM descriptions WHERE url = ?", (url,)).fetchone()
+
+        return None if row is None else json.loads(row[0])
+
+    def add_fields(self, url: str, fields: dict[str, str]) -> None:
+        """Remembers the parsed fields of a description"""
+        self.connect().execute("INSERT OR REPLACE INTO descriptions VALUES (?, ?, ?)",
+                               (url, json.dumps(fields), time.time()))
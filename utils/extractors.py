@@ -0,0 +1,227 @@
+import re
+import json
+import threading
+import html as html_lib
+from importlib.util import find_spec
+from collections import Counter
+from typing import Any, Optional
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+from .metrics import PROFILER
+from .values import price_text, date_text
+
+BS4_PARSER = "lxml" if find_spec("lxml") is not None else "html.parser"
+
+IFRAME_REGEX = re.compile(r"<iframe\b[^>]*\bid=[\"']?desc_ifr\b[^>]*>", re.I)
+SRC_REGEX = re.compile(r"\bsrc=(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))", re.I)
+
+MODEL_START = "[]).concat("
+MODEL_END = ")</script></body>"
+ABOUT_THIS_ITEM_REGEX = re.compile(r'"ABOUT_THIS_ITEM"\s*:\s*')
+
+
+class ExtractionError(Exception):
+    """Raised when a page doesn't match any known layout"""
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+
+        self.reason = reason
+
+
+class HtmlExtractor:
+    """Parses each document once with the fastest available backend"""
+    def __init__(self, backend: Optional[str] = None) -> None:
+        if backend is None:
+            backend = "selectolax" if LexborHTMLParser is not None else BS4_PARSER
+
+        if backend == "selectolax" and LexborHTMLParser is None:
+            raise ImportError("selectolax is not installed")
+
+        self.backend = backend
+
+    def __parse(self, html: str, only: Optional[tuple[str, str]] = None) -> Any:
+        """Parses a document with the configured backend, bs4 keeping only the (tag, class) subtree"""
+        if self.backend == "selectolax":
+            return LexborHTMLParser(html)
+
+        from bs4 import BeautifulSoup, SoupStrainer
+
+        strainer = SoupStrainer(only[0], {"class": only[1]}) if only else None
+
+        return BeautifulSoup(html, self.backend, parse_only=strainer)
+
+    def __select_one(self, node: Any, selector: str) -> Any:
+        """Selects the first node matching a css selector"""
+        if self.backend == "selectolax":
+            return node.css_first(selector)
+
+        return node.select_one(selector)
+
+    def __select(self, node: Any, selector: str) -> list[Any]:
+        """Selects all nodes matching a css selector"""
+        if self.backend == "selectolax":
+            return node.css(selector)
+
+        return node.select(selector)
+
+    def __text(self, node: Any) -> str:
+        """Gets the stripped text of a node"""
+        if self.backend == "selectolax":
+            return node.text(strip=True)
+
+        return node.get_text(strip=True)
+
+    def __attribute(self, node: Any, name: str) -> Optional[str]:
+        """Gets an attribute of a node"""
+        if self.backend == "selectolax":
+            return node.attributes.get(name)
+
+        return node.get(name)
+
+    @PROFILER
+    def extract_results(self, html: str) -> tuple[list[dict[str, str]], int]:
+        """Extracts bidadoo equipements and the number of pages from a results page
+
+        Prices and sale dates are normalized to decimal text like "1250.00" and
+        ISO dates, so the same listing compares equal across runs.
+        """
+        tree = self.__parse(html, ("div", "results"))
+
+        results = self.__select_one(tree, "div.results")
+
+        equipements = []
+
+        for equipement in self.__select(results, "div.category__ct"):
+            price = self.__select_one(equipement, "div.category__txt > p")
+            link_tag = self.__select_one(equipement, "a.category__butt")
+            description = self.__select_one(equipement, "div.category__head")
+
+            equipements.append({"desc": self.__text(description),
+                                "price": price_text(self.__text(price)),
+                                "link": self.__attribute(link_tag, "href"),
+                                "date": date_text(self.__text(link_tag).split(" ")[-1])})
+
+        return equipements, int(self.__attribute(results, "data-num-pages"))
+
+    def extract_iframe_source(self, html: str) -> Optional[str]:
+        """Gets the description iframe source with a targeted scan of the page"""
+        tag = IFRAME_REGEX.search(html)
+
+        if tag is None:
+            return
+
+        src = SRC_REGEX.search(tag.group())
+
+        if src is None:
+            return
+
+        return html_lib.unescape(next(group for group in src.groups() if group is not None))
+
+    @PROFILER
+    def extract_item_slugs(self, html: str) -> dict[str, str]:
+        """Extracts item slugs from an ebay description page"""
+        equipement = {}
+
+        tree = self.__parse(html, ("div", "container"))
+
+        unordered_list = self.__select_one(tree, "div.container ul.list-group")
+
+        if unordered_list is None:
+            return equipement
+
+        for list_item in self.__select(unordered_list, "li"):
+            try:
+                key, value = self.__text(list_item).split(":")
+
+                equipement[key.strip()] = value.strip()
+            except:
+                pass
+
+        return equipement
+
+
+class EbayModelExtractor:
+    """Extracts item features from the model embedded in ebay item pages"""
+    def __init__(self) -> None:
+        self.decoder = json.JSONDecoder()
+
+        self.layouts = Counter()
+        self.lock = threading.Lock()
+
+    def __count(self, layout: str) -> None:
+        """Counts a matched layout or failure"""
+        with self.lock:
+            self.layouts[layout] += 1
+
+    def __find_model(self, html: str) -> tuple[int, int]:
+        """Finds the offsets of the embedded model with anchored searches"""
+        end = html.rfind(MODEL_END)
+
+        if end == -1:
+            raise ExtractionError("no_model_script")
+
+        start = html.rfind(MODEL_START, 0, end)
+
+        if start == -1:
+            raise ExtractionError("no_model_script")
+
+        return start + len(MODEL_START), end
+
+    def __decode_about_this_item(self, html: str, start: int, end: int) -> Optional[dict]:
+        """Decodes only the ABOUT_THIS_ITEM subtree of the model"""
+        for key in ABOUT_THIS_ITEM_REGEX.finditer(html, start, end):
+            try:
+                module, _ = self.decoder.raw_decode(html, key.end())
+
+                return module["sections"]["features"]["dataItems"]
+            
+            except (ValueError, KeyError, TypeError):
+                pass
+
+    def __decode_model(self, html: str, start: int, end: int) -> dict:
+        """Decodes the whole model, following the original path to the features"""
+        try:
+            modules = json.loads(html[start:end])["o"]["w"][0][2]["model"]["modules"]
+        
+        except (ValueError, KeyError, IndexError, TypeError):
+            raise ExtractionError("unknown_model_layout")
+        
+        try:
+            return modules["ABOUT_THIS_ITEM"]["sections"]["features"]["dataItems"]
+        
+        except (KeyError, TypeError):
+            raise ExtractionError("no_about_this_item")
+
+    @PROFILER
+    def extract(self, html: Optional[str]) -> tuple[dict, str]:
+        """Extracts item features, returning them with the name of the matched layout"""
+        try:
+            if html is None:
+                raise ExtractionError("no_page")
+
+            start, end = self.__find_model(html)
+
+            features = self.__decode_about_this_item(html, start, end)
+
+            layout = "about_this_item"
+
+            if features is None:
+                features = self.__decode_model(html, start, end)
+
+                layout = "full_model"
+
+            if not isinstance(features, dict):
+                raise ExtractionError("no_features")
+
+        except ExtractionError as e:
+            self.__count(f"failed:{e.reason}")
+
+            raise
+
+        self.__count(layout)
+
+        return features, layout
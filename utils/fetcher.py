@@ -0,0 +1,329 @@
+import time
+import random
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Optional, Mapping
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
+
+if TYPE_CHECKING:
+    import requests
+    from requests import Response
+
+from .logger import Logger
+from .metrics import METRICS
+from .cache import ResponseCache, CachedResponse
+
+
+class FetchError(Exception):
+    """Raised when a page can't be retrieved after all retries"""
+    def __init__(self, url: str, reason: str, attempts: int = 0) -> None:
+        super().__init__("Couldn't retrieve {} after {} attempts: {}".format(url, attempts, reason))
+
+        self.url = url
+        self.reason = reason
+        self.attempts = attempts
+
+
+class RateLimiter:
+    """Spaces out requests to the same host"""
+    def __init__(self, rate: Optional[float] = None) -> None:
+        self.interval = 1 / rate if rate else 0
+
+        self.next_slots = {}
+        self.lock = threading.Lock()
+
+    def reserve(self, url: str) -> float:
+        """Reserves the next request slot for the host of a url, returning the time to wait"""
+        if not self.interval:
+            return 0
+
+        host = urlsplit(url).netloc
+
+        with self.lock:
+            now = time.monotonic()
+
+            slot = max(now, self.next_slots.get(host, now))
+
+            self.next_slots[host] = slot + self.interval
+
+        return slot - now
+
+
+class Fetcher:
+    """Fetches pages with pooled sessions, backoff, rate limits and caching"""
+    def __init__(self,
+                 headers: Mapping[str, str],
+                 retries: int = 10,
+                 backoff: float = 0.5,
+                 max_backoff: float = 60,
+                 timeout: float = 10,
+                 rate: Optional[float] = None,
+                 cache: Optional[ResponseCache] = None,
+                 proxy_pool: Optional[Any] = None,
+                 user_agent: Optional[Callable[[], str]] = None,
+                 accept: tuple[int, ...] = (),
+                 verify: bool = True,
+                 pool_size: int = 10) -> None:
+        self.headers = dict(headers)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.proxy_pool = proxy_pool
+        self.user_agent = user_agent
+        self.accept = accept
+        self.verify = verify
+        self.pool_size = pool_size
+
+        self.rate_limiter = RateLimiter(rate)
+
+        self.local = threading.local()
+
+        self.logger = Logger(__class__.__name__)
+
+    def __get_session(self) -> "requests.Session":
+        """Gets the keep-alive session of the current thread"""
+        session = getattr(self.local, "session", None)
+
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+
+            self.local.session = session
+
+        return session
+
+    def __get_headers(self, cached: Optional[CachedResponse]) -> dict[str, str]:
+        """Builds the request headers, with validators for a cached response"""
+        headers = {**self.headers}
+
+        if self.user_agent is not None:
+            headers["User-Agent"] = self.user_agent()
+
+        if self.cache is not None:
+            headers.update(self.cache.validators(cached))
+
+        return headers
+
+    def __get_backoff(self, attempt: int) -> float:
+        """Gets an exponential backoff delay with full jitter"""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def __get_retry_after(self, headers: Mapping[str, str]) -> Optional[float]:
+        """Gets the delay requested by a Retry-After header"""
+        retry_after = headers.get("Retry-After")
+
+        if retry_after is None:
+            return
+
+        try:
+            return min(self.max_backoff, max(0, float(retry_after)))
+
+        except ValueError:
+            pass
+
+        try:
+            delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+
+            return min(self.max_backoff, max(0, delay))
+
+        except (TypeError, ValueError):
+            pass
+
+    def __lookup_cache(self,
+                       url: str,
+                       params: Optional[Mapping[str, str]],
+                       ttl: Optional[float]) -> tuple[Optional[CachedResponse], bool]:
+        """Looks up a page in the cache, returning it and whether it can be used as is"""
+        if self.cache is None:
+            return None, False
+
+        cached = self.cache.get(url, params)
+
+        if self.cache.offline:
+            if cached is None:
+                raise FetchError(url, "not cached in offline mode")
+
+            METRICS.increment("cache_total", result="hit")
+
+            return cached, True
+
+        usable = cached is not None and cached.is_fresh(ttl)
+
+        METRICS.increment("cache_total", result="hit" if usable else 
+                          "stale" if cached is not None else "miss")
+
+        return cached, usable
+
+    def __store(self,
+                url: str,
+                params: Optional[Mapping[str, str]],
+                status: int,
+                text: str,
+                headers: Mapping[str, str]) -> None:
+        """Stores a retrieved page in the cache"""
+        if self.cache is not None:
+            self.cache.put(url, status, text, headers, params=params)
+
+    def __is_accepted(self, status: int) -> bool:
+        """Checks whether a response status is final"""
+        return status < 400 or status in self.accept
+
+    def fetch(self,
+              url: str,
+              params: Optional[Mapping[str, str]] = None,
+              ttl: Optional[float] = None) -> "Response|CachedResponse":
+        """Fetches a page, raising a FetchError when all retries fail"""
+        cached, usable = self.__lookup_cache(url, params, ttl)
+
+        if usable:
+            return cached
+
+        import requests
+
+        reason = ""
+
+        for attempt in range(self.retries):
+            time.sleep(self.rate_limiter.reserve(url))
+
+            try:
+                with METRICS.time("proxy_wait"):
+                    proxy = self.proxy_pool.get() if self.proxy_pool is not None else None
+            
+            except Exception as e:
+                raise FetchError(url, type(e).__name__, attempt) from e
+
+            proxies = {"http": f"http://{proxy}", "https": f"http://{proxy}"} if proxy else None
+
+            try:
+                with METRICS.time("fetch"):
+                    response = self.__get_session().get(url,
+                                                        params=params,
+                                                        headers=self.__get_headers(cached),
+                                                        timeout=self.timeout,
+                                                        proxies=proxies,
+                                                        verify=self.verify)
+
+            except requests.RequestException as e:
+                reason = type(e).__name__
+
+                METRICS.increment("errors_total", reason=reason)
+
+                if proxy is not None:
+                    self.proxy_pool.report_failure(proxy)
+
+                    continue
+
+                delay = self.__get_backoff(attempt)
+
+            else:
+                METRICS.increment("responses_total", status=response.status_code)
+
+                if proxy is not None:
+                    if self.__is_accepted(response.status_code):
+                        self.proxy_pool.report_success(proxy, response.elapsed.total_seconds())
+                    else:
+                        self.proxy_pool.report_failure(proxy)
+
+                if response.status_code == 304 and cached is not None:
+                    return self.cache.refresh(cached)
+
+                if self.__is_accepted(response.status_code):
+                    self.__store(url, params, response.status_code,
+                                 response.text, response.headers)
+
+                    return response
+
+                reason = "HTTP {}".format(response.status_code)
+
+                delay = self.__get_retry_after(response.headers)
+
+                if delay is None:
+                    delay = self.__get_backoff(attempt)
+
+            if attempt + 1 < self.retries:
+                self.logger.warn("Couldn't retrieve {} ({}). Retrying in {:.1f}s...".format(
+                    url, reason, delay))
+
+                METRICS.increment("retries_total", reason=reason)
+
+                with METRICS.time("retry"):
+                    time.sleep(delay)
+
+        raise FetchError(url, reason, self.retries)
+
+    async def fetch_async(self,
+                          session: Any,
+                          url: str,
+                          params: Optional[Mapping[str, str]] = None,
+                          ttl: Optional[float] = None,
+                          semaphore: Optional[asyncio.Semaphore] = None) -> str:
+        """Fetches a page's text with an aiohttp session, raising a FetchError when all retries fail"""
+        cached, usable = self.__lookup_cache(url, params, ttl)
+
+        if usable:
+            return cached.text
+
+        try:
+            from aiohttp import ClientError
+        except ImportError:
+            ClientError = OSError
+
+        reason = ""
+
+        semaphore = semaphore or asyncio.Semaphore(1)
+
+        for attempt in range(self.retries):
+            await asyncio.sleep(self.rate_limiter.reserve(url))
+
+            try:
+                async with semaphore:
+                    with METRICS.time("fetch"):
+                        async with session.get(url,
+                                               params=params,
+                                               headers=self.__get_headers(cached)) as response:
+                            METRICS.increment("responses_total", status=response.status)
+
+                            if response.status == 304 and cached is not None:
+                                return self.cache.refresh(cached).text
+
+                            if self.__is_accepted(response.status):
+                                text = await response.text()
+
+                                self.__store(url, params, response.status, text, response.headers)
+
+                                return text
+
+                            reason = "HTTP {}".format(response.status)
+
+                            delay = self.__get_retry_after(response.headers)
+
+            except (ClientError, OSError, asyncio.TimeoutError) as e:
+                reason = type(e).__name__
+
+                METRICS.increment("errors_total", reason=reason)
+
+                delay = None
+
+            if delay is None:
+                delay = self.__get_backoff(attempt)
+
+            if attempt + 1 < self.retries:
+                self.logger.warn("Couldn't retrieve {} ({}). Retrying in {:.1f}s...".format(
+                    url, reason, delay))
+
+                METRICS.increment("retries_total", reason=reason)
+
+                with METRICS.time("retry"):
+                    await asyncio.sleep(delay)
+
+        raise FetchError(url, reason, self.retries)
@@ -0,0 +1,195 @@
+import os
+import re
+import time
+from typing import Any, Iterable, Optional
+
+from .dataset import dataset_files, iter_table
+from .sqlite_store import SqliteStore
+from .values import parse_price, parse_date, to_cents, from_cents
+
+HISTORY_PATH = "./cache/history.sqlite3"
+
+RUN_REGEX = re.compile(r"(.*?)(?:_(\d+))?$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run TEXT PRIMARY KEY,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS listings (
+    link TEXT PRIMARY KEY,
+    make TEXT,
+    model TEXT,
+    year INTEGER,
+    hours INTEGER,
+    price_cents INTEGER,
+    sale_date TEXT,
+    first_run TEXT NOT NULL,
+    last_run TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS listings_make_model ON listings (make COLLATE NOCASE, model COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS prices (
+    link TEXT NOT NULL,
+    run TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    price_cents INTEGER,
+    sale_date TEXT,
+    previous_cents INTEGER,
+    previous_date TEXT,
+    PRIMARY KEY (link, run)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS prices_run ON prices (run);
+"""
+
+NEW = "new"
+CHANGED = "changed"
+
+
+def to_int(value: Any) -> Optional[int]:
+    """Parses a year or meter reading like "1,250" to an integer"""
+    try:
+        return int(float(str(value).replace(",", "")))
+
+    except (TypeError, ValueError):
+        return
+
+
+def run_order(run: str) -> tuple[str, int]:
+    """Sorts runs like results_2023-09-08_2 by date, then by run of the day"""
+    name, number = RUN_REGEX.match(run).groups()
+
+    return name, int(number or 1)
+
+
+class ListingHistory(SqliteStore):
+    """Latest state of every listing by link, with its price and sale date changes per run
+
+    A listing gets a `prices` row only in the runs where it is first seen or
+    its price or sale date differs from the previous run, which keeps the
+    store compact while answering change and price history queries.
+    """
+    schema = SCHEMA
+
+    def __init__(self, path: str = HISTORY_PATH) -> None:
+        super().__init__(path)
+
+    def start_run(self, run: str) -> None:
+        """Registers a run, keeping the start time of a resumed one"""
+        self.connect().execute("INSERT OR IGNORE INTO runs VALUES (?, ?)", (run, time.time()))
+
+    def runs(self) -> list[str]:
+        """Lists the runs from the oldest to the latest"""
+        return sorted((run for run, in self.connect().execute("SELECT run FROM runs")), key=run_order)
+
+    def record(self, run: str, record: dict[str, Any]) -> Optional[str]:
+        """Records a listing seen by a run, returning whether it was new or changed"""
+        link = record.get("LINK TO LISTING")
+
+        if not link:
+            return
+
+        price = to_cents(parse_price(record.get("BIDADOO PRICE")))
+
+        sale_date = parse_date(record.get("SALE DATE"))
+        sale_date = sale_date.isoformat() if sale_date else None
+
+        fields = (record.get("MAKE") or None, record.get("MODEL") or None,
+                  to_int(record.get("YEAR")), to_int(record.get("HOURS")))
+
+        connection = self.connect()
+
+        with self.lock:
+            previous = connection.execute(
+                "SELECT price_cents, sale_date FROM listings WHERE link = ?", (link,)).fetchone()
+
+            connection.execute("BEGIN")
+
+            try:
+                connection.execute(
+                    "INSERT INTO listings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (link) DO UPDATE SET make = excluded.make, model = excluded.model, "
+                    "year = excluded.year, hours = excluded.hours, price_cents = excluded.price_cents, "
+                    "sale_date = excluded.sale_date, last_run = excluded.last_run",
+                    (link, *fields, price, sale_date, run, run))
+
+                kind = None
+
+                if previous is None:
+                    kind = NEW
+                elif previous != (price, sale_date):
+                    kind = CHANGED
+
+                if kind is not None:
+                    connection.execute("INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                       (link, run, kind, price, sale_date,
+                                        *(previous or (None, None))))
+
+                connection.execute("COMMIT")
+
+            except BaseException:
+                connection.execute("ROLLBACK")
+
+                raise
+
+        return kind
+
+    def changes(self, run: Optional[str] = None) -> list[dict[str, Any]]:
+        """Gets the listings that were new or changed price or sale date in a run, the latest by default"""
+        if run is None:
+            runs = self.runs()
+
+            if not runs:
+                return []
+
+            run = runs[-1]
+
+        rows = self.connect().execute(
+            "SELECT p.link, l.make, l.model, l.year, p.kind, p.previous_cents, p.price_cents, "
+            "p.previous_date, p.sale_date FROM prices p JOIN listings l USING (link) "
+            "WHERE p.run = ? ORDER BY p.kind, l.make, l.model, p.link", (run,))
+
+        return [{"link": link, "make": make, "model": model, "year": year, "kind": kind,
+                 "previous_price": from_cents(previous_cents), "price": from_cents(price_cents),
+                 "previous_date": previous_date, "sale_date": sale_date}
+                for (link, make, model, year, kind, previous_cents, price_cents,
+                     previous_date, sale_date) in rows]
+
+    def price_history(self, make: str, model: Optional[str] = None) -> list[dict[str, Any]]:
+        """Gets every recorded price of the listings of a make, or of a make and model"""
+        query = ("SELECT l.make, l.model, l.year, l.hours, p.link, p.run, p.sale_date, p.price_cents "
+                 "FROM listings l JOIN prices p USING (link) WHERE l.make = ? COLLATE NOCASE")
+        params = [make]
+
+        if model is not None:
+            query += " AND l.model = ? COLLATE NOCASE"
+            params.append(model)
+
+        rows = self.connect().execute(query + " ORDER BY p.sale_date, p.link", params)
+
+        return [{"make": make, "model": model, "year": year, "hours": hours, "link": link,
+                 "run": run, "sale_date": sale_date, "price": from_cents(price_cents)}
+                for make, model, year, hours, link, run, sale_date, price_cents in rows]
+
+    def import_records(self, run: str, records: Iterable[dict[str, Any]]) -> int:
+        """Records the listings of a past run, returning how many were new or changed"""
+        self.start_run(run)
+
+        return sum(self.record(run, record) is not None for record in records)
+
+    def import_dataset(self, root: str) -> int:
+        """Imports the runs of a results dataset not recorded yet, oldest first, returning how many"""
+        known = set(self.runs())
+
+        files = {}
+
+        for path in dataset_files(root):
+            files.setdefault(os.path.splitext(os.path.basename(path))[0], []).append(path)
+
+        imported = 0
+
+        for run in sorted(set(files) - known, key=run_order):
+            self.import_records(run, (record for path in files[run] for record in iter_table(path)))
+
+            imported += 1
+
+        return imported
@@ -0,0 +1,128 @@
+import glob
+import os
+import time
+from typing import Iterable
+
+from .dataset import read_table
+from .sqlite_store import SqliteStore
+from .values import price_text, date_text
+
+INDEX_PATH = "./cache/listings.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    link TEXT NOT NULL,
+    price TEXT NOT NULL,
+    date TEXT NOT NULL,
+    captured_at REAL NOT NULL,
+    PRIMARY KEY (link, price, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS imported_files (
+    path TEXT PRIMARY KEY,
+    modified_at REAL NOT NULL
+);
+"""
+
+LISTING = tuple[str, str, str]
+
+KEY_VERSION = 1
+
+
+def listing_key(link: str, price: str, date: str) -> LISTING:
+    """Gets the key of a listing, with its price and sale date in their normalized form"""
+    return link, price_text(price), date_text(date)
+
+
+class ListingIndex(SqliteStore):
+    """Persistent index of listings captured by previous runs"""
+    schema = SCHEMA
+
+    def __init__(self, path: str = INDEX_PATH) -> None:
+        super().__init__(path)
+
+        self.__migrate()
+
+        rows = self.connect().execute("SELECT link, price, date FROM listings")
+
+        self.listings = set(rows)
+
+    def __migrate(self) -> None:
+        """Rewrites listings stored with raw prices and dates in their normalized form, once"""
+        connection = self.connect()
+
+        if connection.execute("PRAGMA user_version").fetchone()[0] >= KEY_VERSION:
+            return
+
+        connection.execute("BEGIN IMMEDIATE")
+
+        try:
+            rows = connection.execute("SELECT link, price, date, captured_at FROM listings").fetchall()
+
+            connection.execute("DELETE FROM listings")
+            connection.executemany("INSERT OR IGNORE INTO listings VALUES (?, ?, ?, ?)",
+                                   [(*listing_key(link, price, date), captured_at)
+                                    for link, price, date, captured_at in rows])
+            connection.execute(f"PRAGMA user_version = {KEY_VERSION}")
+
+            connection.execute("COMMIT")
+
+        except BaseException:
+            connection.execute("ROLLBACK")
+
+            raise
+
+    def __contains__(self, listing: LISTING) -> bool:
+        return listing_key(*listing) in self.listings
+
+    def __len__(self) -> int:
+        return len(self.listings)
+
+    def add_many(self, listings: Iterable[LISTING]) -> None:
+        """Adds captured listings to the index"""
+        now = time.time()
+
+        listings = {listing_key(*listing) for listing in listings}
+
+        with self.lock:
+            new_listings = [listing for listing in listings if listing not in self.listings]
+
+            self.listings.update(new_listings)
+
+        self.connect().executemany(
+            "INSERT OR IGNORE INTO listings VALUES (?, ?, ?, ?)",
+            [(*listing, now) for listing in new_listings])
+
+    def add(self, link: str, price: str, date: str) -> None:
+        """Adds a captured listing to the index"""
+        self.add_many([(link, price, date)])
+
+    def import_results(self, *patterns: str) -> int:
+        """Adds the listings of result files not imported yet, returning how many files were read"""
+        connection = self.connect()
+
+        imported = dict(connection.execute("SELECT path, modified_at FROM imported_files"))
+
+        files = 0
+
+        for path in sorted(path for pattern in patterns for path in glob.glob(pattern)):
+            modified_at = os.path.getmtime(path)
+
+            if imported.get(path) == modified_at:
+                continue
+
+            columns = ["LINK TO LISTING", "BIDADOO PRICE", "SALE DATE"]
+
+            try:
+                df = read_table(path, columns)[columns]
+            
+            except (ValueError, KeyError):
+                continue
+
+            self.add_many(df.dropna().itertuples(index=False, name=None))
+
+            connection.execute("INSERT OR REPLACE INTO imported_files VALUES (?, ?)",
+                               (path, modified_at))
+
+            files += 1
+
+        return files
@@ -1,40 +1,97 @@
-import sys
+import os
+import time
+import atexit
 import logging
-from typing import Optional
+import threading
+from queue import SimpleQueue
+from typing import Any, Optional
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_PATH = "./logs/logs.log"
+
+FORMAT = "%(name)s:%(levelname)s - %(message)s"
+
+_lock = threading.Lock()
+_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+_pid: Optional[int] = None
+
+
+def configure(path: str = LOG_PATH, level: int = logging.INFO) -> None:
+    """Routes log records through a queue to one background writer, once per process"""
+    global _handler, _listener, _pid
+
+    with _lock:
+        if _pid == os.getpid():
+            return
+
+        root = logging.getLogger()
+
+        if _handler is not None:
+            root.removeHandler(_handler)
+
+        fmt = logging.Formatter(FORMAT)
+
+        s_handler = logging.StreamHandler()
+        s_handler.setLevel(level)
+        s_handler.setFormatter(fmt)
+
+        handlers = [s_handler]
+
+        if os.path.isdir(os.path.dirname(path) or "."):
+            f_handler = logging.FileHandler(path, "a")
+            f_handler.setLevel(level)
+            f_handler.setFormatter(fmt)
+
+            handlers.append(f_handler)
+
+        queue = SimpleQueue()
+
+        _handler = QueueHandler(queue)
+        _listener = QueueListener(queue, *handlers, respect_handler_level=True)
+        _pid = os.getpid()
+
+        root.addHandler(_handler)
+
+        _listener.start()
+
+        atexit.register(_listener.stop)
+
 
 class Logger:
     """Logs info, warning and error messages"""
-    def __init__(self, 
-                 name: Optional[str] = __name__) -> None:
+    def __init__(self,
+                 name: Optional[str] = __name__,
+                 progress_interval: float = 1) -> None:
+        configure()
+
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.INFO)
 
-        s_handler = logging.StreamHandler()
-        f_handler = logging.FileHandler(
-                        "./logs/logs.log", "w")
-        
-        fmt = logging.Formatter(
-            "%(name)s:%(levelname)s - %(message)s")
-        
-        s_handler.setLevel(logging.INFO)
-        f_handler.setLevel(logging.INFO)
-
-        s_handler.setFormatter(fmt)
-        f_handler.setFormatter(fmt)
-
-        self.logger.addHandler(s_handler)
-        self.logger.addHandler(f_handler)
+        self.progress_interval = progress_interval
+        self.progress_at = 0.0
+        self.progress_lock = threading.Lock()
 
     def info(self, message: str) -> None:
         """Logs an info message"""
         self.logger.info(message)
-    
+
     def warn(self, message: str) -> None:
         """Logs a warning message"""
         self.logger.warning(message)
-    
+
     def error(self, message: str) -> None:
         """Logs an error message"""
         self.logger.error(message, exc_info=True)
 
-        # sys.exit(1)
\ No newline at end of file
+    def progress(self, message: str, *args: Any) -> None:
+        """Logs a per-item progress message at most once per progress interval"""
+        now = time.monotonic()
+
+        with self.progress_lock:
+            if now - self.progress_at < self.progress_interval:
+                return
+
+            self.progress_at = now
+
+        self.logger.info(message.format(*args))
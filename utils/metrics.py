@@ -0,0 +1,300 @@
+import os
+import json
+import time
+import argparse
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional
+
+if TYPE_CHECKING:
+    import cProfile
+    from http.server import ThreadingHTTPServer
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+LABELS = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Counts observations in fixed buckets, Prometheus style"""
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Iterator[tuple[str, int]]:
+        """Yields the upper bound and cumulative count of every bucket"""
+        total = 0
+
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+
+            yield str(bound), total
+
+
+class Metrics:
+    """Thread-safe registry of counters and stage timing histograms"""
+    def __init__(self, prefix: str = "bidadoo") -> None:
+        self.prefix = prefix
+
+        self.counters: dict[tuple[str, LABELS], float] = {}
+        self.histograms: dict[tuple[str, LABELS], Histogram] = {}
+
+        self.lock = threading.Lock()
+
+    def increment(self, name: str, amount: float = 1, **labels: Any) -> None:
+        """Adds to a counter"""
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Records an observation in a histogram"""
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+        with self.lock:
+            histogram = self.histograms.get(key)
+
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+
+            histogram.observe(value)
+
+    @contextmanager
+    def time(self, stage: str, **labels: Any) -> Iterator[None]:
+        """Times a block as a pipeline stage: fetch, retry, proxy_wait, parse, reconcile or save"""
+        start = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=stage, **labels)
+
+    def __labels(self, labels: LABELS, **extra: str) -> str:
+        """Formats labels for the text exposition format"""
+        pairs = [*labels, *extra.items()]
+
+        if not pairs:
+            return ""
+
+        return "{" + ",".join('{}="{}"'.format(k, v.replace('"', '\\"')) for k, v in pairs) + "}"
+
+    def render(self) -> str:
+        """Renders the metrics in the Prometheus text exposition format"""
+        lines, typed = [], set()
+
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                name = f"{self.prefix}_{name}"
+
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+
+                    typed.add(name)
+
+                lines.append(f"{name}{self.__labels(labels)} {value}")
+
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                name = f"{self.prefix}_{name}"
+
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+
+                    typed.add(name)
+
+                for bound, count in histogram.cumulative():
+                    lines.append(f"{name}_bucket{self.__labels(labels, le=bound)} {count}")
+
+                lines.append(f"{name}_sum{self.__labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{self.__labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, Any]:
+        """Gets the metrics as a json-serializable dict"""
+        with self.lock:
+            return {"time": time.time(),
+                    "counters": [{"name": name, "labels": dict(labels), "value": value}
+                                 for (name, labels), value in sorted(self.counters.items())],
+                    "histograms": [{"name": name, "labels": dict(labels),
+                                    "count": histogram.count, "sum": histogram.sum,
+                                    "buckets": dict(histogram.cumulative())}
+                                   for (name, labels), histogram in sorted(self.histograms.items())]}
+
+    def summary(self) -> str:
+        """Summarizes the time spent in each stage"""
+        totals = {}
+
+        with self.lock:
+            for (name, labels), histogram in self.histograms.items():
+                if name == "stage_seconds":
+                    stage = dict(labels)["stage"]
+
+                    count, seconds = totals.get(stage, (0, 0))
+
+                    totals[stage] = (count + histogram.count, seconds + histogram.sum)
+
+        return " || ".join("{}: {} in {:.1f}s".format(stage, count, seconds)
+                           for stage, (count, seconds) in sorted(totals.items()))
+
+    def write_snapshot(self, path: str) -> None:
+        """Writes a json snapshot of the metrics"""
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(self.snapshot(), f)
+
+        os.replace(f"{path}.tmp", path)
+
+    def write_snapshots(self, path: str, interval: float, stopped: threading.Event) -> threading.Thread:
+        """Writes a json snapshot of the metrics every interval seconds until stopped"""
+        def write() -> None:
+            while not stopped.wait(interval):
+                self.write_snapshot(path)
+
+        thread = threading.Thread(target=write, daemon=True)
+        thread.start()
+
+        return thread
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+        """Serves /metrics in the Prometheus text format and /metrics.json as a snapshot"""
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path == "/metrics.json":
+                    body, content_type = json.dumps(metrics.snapshot()), "application/json"
+                else:
+                    body, content_type = metrics.render(), "text/plain; version=0.0.4"
+
+                data = body.encode("utf-8")
+
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+
+                self.wfile.write(data)
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        return server
+
+
+class Profiler:
+    """Opt-in cProfile hook for hot paths, with one profile per thread"""
+    def __init__(self) -> None:
+        self.enabled = False
+
+        self.local = threading.local()
+        self.profiles: list["cProfile.Profile"] = []
+        self.lock = threading.Lock()
+
+    def __call__(self, function: Callable) -> Callable:
+        """Decorates a function to be profiled when the profiler is enabled"""
+        @wraps(function)
+        def profiled(*args, **kwargs) -> Any:
+            if not self.enabled:
+                return function(*args, **kwargs)
+
+            profile = getattr(self.local, "profile", None)
+
+            if profile is None:
+                import cProfile
+
+                profile = self.local.profile = cProfile.Profile()
+
+                with self.lock:
+                    self.profiles.append(profile)
+
+            return profile.runcall(function, *args, **kwargs)
+
+        return profiled
+
+    def dump(self, path: str) -> None:
+        """Merges the profiles of all threads into a pstats file"""
+        import pstats
+
+        with self.lock:
+            profiles = [profile for profile in self.profiles if profile.getstats()]
+
+        if not profiles:
+            return
+
+        stats = pstats.Stats(profiles[0])
+
+        for profile in profiles[1:]:
+            stats.add(profile)
+
+        stats.dump_stats(path)
+
+
+METRICS = Metrics()
+
+PROFILER = Profiler()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the metrics and profiling options to a command line parser"""
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve /metrics and /metrics.json on this port")
+    parser.add_argument("--metrics-snapshot",
+                        help="write json snapshots of the metrics to this file")
+    parser.add_argument("--metrics-interval", type=float, default=10,
+                        help="seconds between metrics snapshots")
+    parser.add_argument("--profile",
+                        help="profile the parsing hot paths into this pstats file")
+
+
+class Reporting:
+    """Starts and stops the metrics endpoint, snapshots and profiler asked for on the command line"""
+    def __init__(self,
+                 port: Optional[int] = None,
+                 snapshot: Optional[str] = None,
+                 interval: float = 10,
+                 profile: Optional[str] = None) -> None:
+        self.snapshot = snapshot
+        self.profile = profile
+
+        self.stopped = threading.Event()
+
+        self.server = METRICS.serve(port) if port else None
+
+        if snapshot:
+            METRICS.write_snapshots(snapshot, interval, self.stopped)
+
+        PROFILER.enabled = profile is not None
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "Reporting":
+        return cls(args.metrics_port, args.metrics_snapshot, args.metrics_interval, args.profile)
+
+    def stop(self) -> None:
+        """Writes the final snapshot and profile"""
+        self.stopped.set()
+
+        if self.snapshot:
+            METRICS.write_snapshot(self.snapshot)
+
+        if self.profile:
+            PROFILER.dump(self.profile)
+
+        if self.server is not None:
+            self.server.shutdown()
@@ -0,0 +1,120 @@
+from datetime import date
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+MIN_YEAR = 1940
+
+YEAR_REGEX = r"(\d{4,})"
+HOURS_REGEX = r"(\d[\d,]*(?:\.\d+)?)"
+
+
+def derive_from_description(descriptions: "pd.Series") -> "pd.DataFrame":
+    """Derives year, make and model from "<year> <make> <model> ..." descriptions"""
+    import pandas as pd
+
+    descriptions = descriptions.fillna("").astype(str)
+
+    years = descriptions.str.extract(YEAR_REGEX, expand=False)
+
+    tokens = descriptions.str.split(" ", n=3, expand=True).reindex(columns=range(3))
+
+    has_year = years.notna()
+
+    return pd.DataFrame({"YEAR": years.fillna(""),
+                         "MAKE": tokens[1].where(has_year, tokens[0]),
+                         "MODEL": tokens[2].where(has_year, tokens[1])})
+
+
+def normalize_years(years: "pd.Series",
+                    min_year: int = MIN_YEAR,
+                    max_year: Optional[int] = None) -> "pd.Series":
+    """Parses years to nullable integers, dropping those outside the bounds"""
+    import pandas as pd
+
+    max_year = max_year or date.today().year
+
+    years = years.astype("string").str.extract(YEAR_REGEX, expand=False)
+
+    years = pd.to_numeric(years, errors="coerce").astype("Int64")
+
+    return years.where(years.between(min_year, max_year))
+
+
+def normalize_hours(hours: "pd.Series") -> "pd.Series":
+    """Parses meter readings like "1,250" to nullable integers"""
+    import pandas as pd
+
+    hours = hours.astype("string").str.extract(HOURS_REGEX, expand=False)
+
+    hours = pd.to_numeric(hours.str.replace(",", "", regex=False), errors="coerce")
+
+    return hours.round().astype("Int64")
+
+
+def normalize(df: "pd.DataFrame",
+              min_year: int = MIN_YEAR,
+              max_year: Optional[int] = None) -> "pd.DataFrame":
+    """Cleans scraped equipements in one columnar pass"""
+    df = df.copy()
+
+    if "desc" in df.columns:
+        derived = derive_from_description(df["desc"])
+
+        for column in derived.columns:
+            if column not in df.columns:
+                df[column] = derived[column]
+            else:
+                missing = df[column].isna() | (df[column].astype("string").str.strip() == "")
+
+                df[column] = df[column].mask(missing, derived[column])
+
+    if "YEAR" in df.columns:
+        df["YEAR"] = normalize_years(df["YEAR"], min_year, max_year)
+
+    if "HOURS" in df.columns:
+        df["HOURS"] = normalize_hours(df["HOURS"])
+
+    for column in ("MAKE", "MODEL"):
+        if column in df.columns:
+            df[column] = df[column].astype("string").str.strip()
+
+    return df.drop_duplicates()
+
+
+def normalize_records(records: Iterable[tuple[Any, dict[str, Any]]],
+                      min_year: int = MIN_YEAR,
+                      max_year: Optional[int] = None,
+                      batch_size: int = 1000) -> "pd.DataFrame":
+    """Normalizes a stream of positioned records in batches, returning them in position order"""
+    import pandas as pd
+
+    frames, batch = [], []
+
+    def flush() -> None:
+        frames.append(normalize(pd.DataFrame(batch), min_year, max_year))
+
+        batch.clear()
+
+    for position, record in records:
+        batch.append({**record, "_position": tuple(position) if isinstance(position, list) else position})
+
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True)
+
+    positions = df["_position"].tolist()
+
+    df = df.iloc[sorted(range(len(df)), key=positions.__getitem__)]
+
+    df = df.drop_duplicates("_position", keep="last").drop(columns="_position")
+
+    return df.drop_duplicates().reset_index(drop=True)
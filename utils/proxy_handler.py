@@ -1,85 +1,267 @@
 import time
+import random
 import threading
-from queue import Queue
-
-import requests
-from bs4 import BeautifulSoup
+from typing import Iterable, Optional
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 
 from .logger import Logger
 
+PROXY_LISTS = {"https://free-proxy-list.net/": 299,
+               "https://sslproxies.org/": None}
+
+
+class ProxyPoolClosed(Exception):
+    """Raised when a proxy is requested from a stopped pool"""
+
+
+class ProxyPoolExhausted(Exception):
+    """Raised when no proxy became available within the wait timeout"""
+
+
+@dataclass
+class ProxyStats:
+    """Health of a proxy"""
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    latency: float = 2.0
+    cooldown_until: float = 0
+    checked_at: float = 0
+
+    @property
+    def score(self) -> float:
+        """Smoothed success rate per second of latency"""
+        success_rate = (self.successes + 1) / (self.successes + self.failures + 2)
+
+        return success_rate / max(self.latency, 0.05)
+
 
 class ProxyHandler:
-    def __init__(self, bad_proxies: list) -> None:
-        self.ports = ["3128", "3124", "80", "8080"]
-        self.proxies = []
+    """Thread-safe pool of scored free proxies
+
+    Proxies failing `max_failures` times in a row are ejected, and may be
+    added back by a refresh once `eject_cooldown` seconds have passed.
+    """
+    def __init__(self,
+                 bad_proxies: set,
+                 max_failures: int = 3,
+                 cooldown: float = 5,
+                 eject_cooldown: float = 1800,
+                 wait_timeout: float = 300,
+                 refresh_interval: float = 60,
+                 validate_interval: float = 120,
+                 validate_url: str = "https://www.ebay.com/robots.txt",
+                 validate_timeout: float = 5,
+                 validate_threads: int = 20) -> None:
+        self.proxies: dict[str, ProxyStats] = {}
         self.bad_proxies = bad_proxies
-        
-        self.proxy_queue = Queue()
-        
+
+        self.ejected_at: dict[str, float] = {}
+
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.eject_cooldown = eject_cooldown
+        self.wait_timeout = wait_timeout
+        self.refresh_interval = refresh_interval
+        self.validate_interval = validate_interval
+        self.validate_url = validate_url
+        self.validate_timeout = validate_timeout
+        self.validate_threads = validate_threads
+
+        self.condition = threading.Condition()
+        self.stopped = threading.Event()
+
         self.logger = Logger("ProxyHandler")
 
-    def get_proxies(self) -> None:
-        """Fetches proxies from https://free-proxy-list.net/"""
+    def __len__(self) -> int:
+        return len(self.proxies)
 
-        while True:
-            try:
-                url = 'https://free-proxy-list.net/'
-                response = requests.get(url)
-                proxies_table = BeautifulSoup(response.text, "html.parser")
+    def add_many(self, proxies: Iterable[str]) -> int:
+        """Adds proxies that aren't known yet or whose ejection expired, returning how many were added"""
+        with self.condition:
+            added = 0
+
+            expired = time.time() - self.eject_cooldown
+
+            for proxy in proxies:
+                if self.ejected_at.get(proxy, expired) < expired:
+                    self.bad_proxies.discard(proxy)
+
+                    self.ejected_at.pop(proxy, None)
+
+                if proxy not in self.proxies and proxy not in self.bad_proxies:
+                    self.proxies[proxy] = ProxyStats()
+
+                    added += 1
+
+            if added:
+                self.condition.notify_all()
+
+        return added
+
+    def stop(self) -> None:
+        """Stops the background threads and wakes up threads waiting for proxies"""
+        self.stopped.set()
+
+        with self.condition:
+            self.condition.notify_all()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until proxies are available"""
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: len(self.proxies) or self.stopped.is_set(), timeout) \
+                    and not self.stopped.is_set()
+
+    def get(self) -> str:
+        """Picks a proxy weighted by its score, waiting up to wait_timeout seconds for one"""
+        deadline = time.time() + self.wait_timeout
+
+        with self.condition:
+            while True:
+                if self.stopped.is_set():
+                    raise ProxyPoolClosed("the proxy pool was stopped")
+
+                now = time.time()
 
-                if response.status_code != 200:
-                    continue
+                candidates = [(proxy, stats.score) for proxy, stats in self.proxies.items()
+                              if stats.cooldown_until <= now]
 
-                table_rows = proxies_table.select("tbody tr")
+                if candidates:
+                    proxies, weights = zip(*candidates)
 
-                if not len(table_rows):
-                    continue
+                    return random.choices(proxies, weights)[0]
 
-                for row in table_rows[:299]:
-                    for port in self.ports:   
-                        proxy = ":".join(
-                            [row.select('td')[0].text.strip(), 
-                             row.select('td')[1].text.strip()])
+                if now >= deadline:
+                    self.logger.warn("No proxy available after {:.0f}s ({} ejected)".format(
+                        self.wait_timeout, len(self.bad_proxies)))
 
-                        if proxy not in self.bad_proxies \
-                            and proxy not in self.proxies:
-                
-                            self.proxies.append(proxy)
+                    raise ProxyPoolExhausted("no proxy available after {:.0f}s".format(self.wait_timeout))
 
-                url = "https://sslproxies.org/"
+                timeout = deadline - now
 
-                response = requests.get(url)
-                proxies_table = BeautifulSoup(response.text, "html.parser")
+                if self.proxies:
+                    timeout = min(timeout, min(stats.cooldown_until for stats in self.proxies.values()) - now)
 
-                if response.status_code != 200:
-                    continue
+                self.condition.wait(timeout)
 
-                table_rows = proxies_table.select("tbody tr")
+    def report_success(self, proxy: str, latency: Optional[float] = None) -> None:
+        """Records a request that went through a proxy"""
+        with self.condition:
+            stats = self.proxies.get(proxy)
 
-                if not len(table_rows):
-                    continue
+            if stats is None:
+                return
 
-                
-                for row in table_rows:
-                    try:
-                        cells = row.select("td")
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.checked_at = time.time()
 
-                        ip = cells[0].get_text(strip=True)
-                        port = cells[1].get_text(strip=True)
+            if latency is not None:
+                stats.latency = 0.8 * stats.latency + 0.2 * latency
 
-                        if not f"{ip}:{port}" in self.bad_proxies \
-                            and f"{ip}:{port}" not in self.proxies:
-                            self.proxies.append(f"{ip}:{port}")
-                    except:pass
+    def report_failure(self, proxy: str) -> None:
+        """Records a failed request, cooling a proxy down and ejecting it after repeated failures"""
+        with self.condition:
+            stats = self.proxies.get(proxy)
 
-            except Exception as e: print(e)
+            if stats is None:
+                return
 
-            self.proxies = list(set(self.proxies))
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.checked_at = time.time()
 
-            bad_proxies = [*self.bad_proxies]
+            if stats.consecutive_failures >= self.max_failures:
+                del self.proxies[proxy]
 
-            [self.proxies.remove(proxy) for proxy in bad_proxies if proxy in self.proxies]
+                self.bad_proxies.add(proxy)
+
+                self.ejected_at[proxy] = time.time()
+
+                return
+
+            stats.cooldown_until = time.time() + self.cooldown * 2 ** (stats.consecutive_failures - 1)
+
+    def __scrape_proxy_list(self, url: str, limit: Optional[int]) -> list[str]:
+        """Scrapes proxies from a free proxy list"""
+        import requests
+        from bs4 import BeautifulSoup
+
+        response = requests.get(url, timeout=10)
+
+        if response.status_code != 200:
+            return []
+
+        table_rows = BeautifulSoup(response.text, "html.parser").select("tbody tr")
+
+        proxies = []
+
+        for row in table_rows[:limit]:
+            try:
+                cells = row.select("td")
+
+                ip = cells[0].get_text(strip=True)
+                port = cells[1].get_text(strip=True)
+
+                proxies.append(f"{ip}:{port}")
+            except:pass
+
+        return proxies
+
+    def get_proxies(self) -> None:
+        """Fetches proxies from https://free-proxy-list.net/ and https://sslproxies.org/"""
+        while not self.stopped.is_set():
+            for url, limit in PROXY_LISTS.items():
+                try:
+                    self.add_many(self.__scrape_proxy_list(url, limit))
+
+                except Exception as e:
+                    self.logger.warn("Couldn't fetch proxies from {}: {}".format(url, e))
 
             self.logger.info(f"Proxies found: {len(self.proxies)}")
 
-            time.sleep(10)
\ No newline at end of file
+            self.stopped.wait(self.refresh_interval)
+
+    def __check(self, proxy: str) -> None:
+        """Checks a proxy against the validation url"""
+        import requests
+
+        if self.stopped.is_set():
+            return
+
+        proxies = {"http": f"http://{proxy}", "https": f"http://{proxy}"}
+
+        try:
+            response = requests.get(self.validate_url,
+                                    proxies=proxies,
+                                    timeout=self.validate_timeout,
+                                    verify=False)
+
+            if response.ok:
+                return self.report_success(proxy, response.elapsed.total_seconds())
+
+        except requests.RequestException:pass
+
+        self.report_failure(proxy)
+
+    def validate_proxies(self) -> None:
+        """Checks proxies that haven't been used recently in the background"""
+        with ThreadPoolExecutor(self.validate_threads) as executor:
+            while not self.stopped.is_set():
+                cutoff = time.time() - self.validate_interval
+
+                with self.condition:
+                    stale = [proxy for proxy, stats in self.proxies.items()
+                             if stats.checked_at < cutoff]
+
+                list(executor.map(self.__check, stale))
+
+                if self.stopped.is_set():
+                    break
+
+                self.logger.info("Proxies validated: {} || Available: {}".format(
+                    len(stale), len(self.proxies)))
+
+                self.stopped.wait(self.validate_interval / 4)
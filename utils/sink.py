@@ -0,0 +1,180 @@
+import os
+import json
+import threading
+from queue import SimpleQueue, Empty
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from .logger import Logger
+from .dataset import write_dataset
+
+
+def read_journal(path: str) -> Iterator[tuple[Any, dict[str, Any]]]:
+    """Reads the positions and records of a jsonl journal, skipping torn lines"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+
+            except ValueError:
+                continue
+
+            yield entry["position"], entry["record"]
+
+
+def read_journals(paths: list[str], columns: Optional[list[str]] = None) -> "pd.DataFrame":
+    """Merges jsonl journals in position order, keeping the last record of a position"""
+    import pandas as pd
+
+    entries = {}
+
+    for path in paths:
+        for position, record in read_journal(path):
+            entries[tuple(position) if isinstance(position, list) else position] = record
+
+    records = [entries[position] for position in sorted(entries)]
+
+    return pd.DataFrame(records, columns=columns).drop_duplicates()
+
+
+class RecordSink:
+    """Appends records once to a jsonl journal and exports them to excel on demand
+
+    Records are handed to a single writer thread, which also checkpoints the
+    journal every `checkpoint_every` records or `checkpoint_interval` seconds.
+    The `done` callbacks of records run once a checkpoint made them durable.
+    """
+    def __init__(self, 
+                 path: str, 
+                 columns: Optional[list[str]] = None, 
+                 append: bool = True,
+                 checkpoint_every: int = 100,
+                 checkpoint_interval: float = 5) -> None:
+        self.path = path
+        self.columns = columns
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self.file = open(path, "a" if append else "w", encoding="utf-8")
+
+        self.queue = SimpleQueue()
+
+        self.logger = Logger(__class__.__name__)
+
+        self.writer = threading.Thread(target=self.__write_records, daemon=True)
+        self.writer.start()
+
+    def __checkpoint(self, callbacks: list[Callable[[], None]]) -> None:
+        """Makes the records written so far durable, then runs their callbacks"""
+        self.file.flush()
+
+        os.fsync(self.file.fileno())
+
+        for callback in callbacks:
+            try:
+                callback()
+
+            except Exception as e:
+                self.logger.error("Couldn't confirm a record of {}: {}".format(self.path, e))
+
+        callbacks.clear()
+
+    def __write_records(self) -> None:
+        """Writes queued records to the journal, checkpointing it periodically"""
+        pending, callbacks = 0, []
+
+        while True:
+            try:
+                entry = self.queue.get(timeout=self.checkpoint_interval)
+            
+            except Empty:
+                if pending:
+                    self.__checkpoint(callbacks)
+
+                    pending = 0
+
+                continue
+
+            if entry is None:
+                break
+
+            if isinstance(entry, threading.Event):
+                self.__checkpoint(callbacks)
+
+                pending = 0
+
+                entry.set()
+
+                continue
+
+            line, done = entry
+
+            self.file.write(line)
+
+            if done is not None:
+                callbacks.append(done)
+
+            pending += 1
+
+            if pending >= self.checkpoint_every:
+                self.__checkpoint(callbacks)
+
+                pending = 0
+
+        self.__checkpoint(callbacks)
+
+    def write(self, 
+              position: Any, 
+              record: dict[str, Any], 
+              done: Optional[Callable[[], None]] = None) -> None:
+        """Appends a record, keeping its position in the output and calling done once it is durable"""
+        line = json.dumps({"position": position, "record": record}, default=str) + "\n"
+
+        self.queue.put((line, done))
+
+    def flush(self, wait: bool = False) -> None:
+        """Asks the writer to make the records written so far durable"""
+        if not self.writer.is_alive():
+            return
+
+        done = threading.Event()
+
+        self.queue.put(done)
+
+        if wait:
+            done.wait()
+
+    def close(self) -> None:
+        """Writes the remaining records and closes the journal"""
+        if self.writer.is_alive():
+            self.queue.put(None)
+
+            self.writer.join()
+
+        self.file.close()
+
+    def read(self) -> Iterator[tuple[Any, dict[str, Any]]]:
+        """Reads back the journaled positions and records"""
+        self.flush(wait=True)
+
+        return read_journal(self.path)
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """Loads the journaled records in position order, keeping the last record of a position"""
+        return read_journals([self.path], self.columns)
+
+    def export_excel(self, path: str) -> int:
+        """Writes the journaled records to an excel workbook, returning how many were written"""
+        df = self.to_dataframe()
+
+        df.to_excel(path, index=False)
+
+        return len(df)
+
+    def export_parquet(self, root: str, name: str) -> int:
+        """Writes the journaled records to a dataset partitioned by sale date, returning how many were written"""
+        return write_dataset(self.to_dataframe(), root, name)
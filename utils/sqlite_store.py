@@ -0,0 +1,32 @@
+import os
+import sqlite3
+import threading
+
+
+class SqliteStore:
+    """Base for sqlite backed stores, with one connection per thread"""
+    schema = ""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self.connect().executescript(self.schema)
+
+    def connect(self) -> sqlite3.Connection:
+        """Gets the sqlite connection of the current thread"""
+        connection = getattr(self.local, "connection", None)
+
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+
+            self.local.connection = connection
+
+        return connection
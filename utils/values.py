@@ -0,0 +1,56 @@
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+PRICE_REGEX = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d", "%m/%d/%y")
+
+CENT = Decimal("0.01")
+
+
+def parse_price(text: Any) -> Optional[Decimal]:
+    """Parses prices like "$1,250.00" to decimals, or None when there is no amount"""
+    match = PRICE_REGEX.search(str(text)) if text is not None else None
+
+    if match is None:
+        return
+
+    return Decimal(match.group().replace(",", "")).quantize(CENT)
+
+
+def parse_date(text: Any) -> Optional[date]:
+    """Parses sale dates like "9/7/2023" or "2023-09-07", or None when it isn't one"""
+    text = str(text).strip() if text is not None else ""
+
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+
+        except ValueError:
+            pass
+
+
+def price_text(text: str) -> str:
+    """Formats a price as plain decimal text like "1250.00", keeping unparseable text as is"""
+    price = parse_price(text)
+
+    return text if price is None else str(price)
+
+
+def date_text(text: str) -> str:
+    """Formats a sale date as ISO text like "2023-09-07", keeping unparseable text as is"""
+    sale_date = parse_date(text)
+
+    return text if sale_date is None else sale_date.isoformat()
+
+
+def to_cents(price: Optional[Decimal]) -> Optional[int]:
+    """Converts a decimal price to integer cents"""
+    return None if price is None else int(price * 100)
+
+
+def from_cents(cents: Optional[int]) -> Optional[Decimal]:
+    """Converts integer cents back to a decimal price"""
+    return None if cents is None else (Decimal(cents) / 100).quantize(CENT)
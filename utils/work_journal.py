@@ -0,0 +1,140 @@
+import json
+import time
+from typing import Any, Iterable
+from dataclasses import dataclass
+
+from .sqlite_store import SqliteStore
+
+JOURNAL_PATH = "./cache/work.sqlite3"
+
+PENDING = "pending"
+FETCHED = "fetched"
+PARSED = "parsed"
+FAILED = "failed"
+
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    output TEXT NOT NULL,
+    sessions INTEGER NOT NULL,
+    finished INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS work (
+    run INTEGER NOT NULL,
+    position TEXT NOT NULL,
+    item TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS work_state ON work (run, state);
+"""
+
+
+def position_key(position: Any) -> Any:
+    """Makes a position read back from json hashable, turning lists into tuples"""
+    return tuple(position) if isinstance(position, list) else position
+
+
+@dataclass
+class Run:
+    """A scraper or cleaner run that can be resumed"""
+    id: int
+    output: str
+    session: int
+
+    @property
+    def resumed(self) -> bool:
+        return self.session > 1
+
+
+class WorkJournal(SqliteStore):
+    """Persistent per-item work states, so crashed runs resume where they stopped"""
+    schema = SCHEMA
+
+    def __init__(self, path: str = JOURNAL_PATH) -> None:
+        super().__init__(path)
+
+    def open_run(self, kind: str, key: str, output: str) -> Run:
+        """Resumes the unfinished run of a kind and key, or starts a new one"""
+        connection = self.connect()
+
+        with self.lock:
+            row = connection.execute(
+                "SELECT id, output, sessions FROM runs "
+                "WHERE kind = ? AND key = ? AND NOT finished ORDER BY id DESC LIMIT 1",
+                (kind, key)).fetchone()
+
+            if row is None:
+                cursor = connection.execute(
+                    "INSERT INTO runs (kind, key, output, sessions, created_at) "
+                    "VALUES (?, ?, ?, 1, ?)", (kind, key, output, time.time()))
+
+                return Run(cursor.lastrowid, output, 1)
+
+            run_id, output, sessions = row
+
+            connection.execute(
+                "UPDATE runs SET sessions = ? WHERE id = ?", (sessions + 1, run_id))
+
+            return Run(run_id, output, sessions + 1)
+
+    def finish(self, run: Run) -> None:
+        """Marks a run as finished"""
+        self.connect().execute("UPDATE runs SET finished = 1 WHERE id = ?", (run.id,))
+
+    def add_many(self, run: Run, work: Iterable[tuple[Any, dict[str, Any]]]) -> None:
+        """Records pending items, keeping the state of items already recorded"""
+        now = time.time()
+
+        rows = [(run.id, json.dumps(position), json.dumps(item, default=str), PENDING, now)
+                for position, item in work]
+
+        self.connect().executemany(
+            "INSERT OR IGNORE INTO work (run, position, item, state, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)", rows)
+
+    def mark(self, run: Run, position: Any, state: str, error: str = None) -> None:
+        """Records the state of an item"""
+        attempts = 1 if state in (PARSED, FAILED) else 0
+
+        self.connect().execute(
+            "UPDATE work SET state = ?, error = ?, attempts = attempts + ?, updated_at = ? "
+            "WHERE run = ? AND position = ?",
+            (state, error, attempts, time.time(), run.id, json.dumps(position)))
+
+    def unfinished(self, run: Run, max_attempts: int = MAX_ATTEMPTS) -> list[tuple[Any, dict[str, Any]]]:
+        """Gets the items of a run that weren't parsed yet, giving up on those failed max_attempts times"""
+        rows = self.connect().execute(
+            "SELECT position, item FROM work WHERE run = ? AND state != ? "
+            "AND NOT (state = ? AND attempts >= ?)", (run.id, PARSED, FAILED, max_attempts))
+
+        return [(json.loads(position), json.loads(item)) for position, item in rows]
+
+    def is_done(self, run: Run, max_attempts: int = MAX_ATTEMPTS) -> bool:
+        """Checks whether every item of a run was parsed or failed max_attempts times"""
+        row = self.connect().execute(
+            "SELECT 1 FROM work WHERE run = ? AND state != ? "
+            "AND NOT (state = ? AND attempts >= ?) LIMIT 1", (run.id, PARSED, FAILED, max_attempts))
+
+        return row.fetchone() is None
+
+    def positions(self, run: Run) -> set[Any]:
+        """Gets the positions of every item recorded for a run, with list positions as tuples"""
+        rows = self.connect().execute("SELECT position FROM work WHERE run = ?", (run.id,))
+
+        return {position_key(json.loads(position)) for position, in rows}
+
+    def counts(self, run: Run) -> dict[str, int]:
+        """Counts the items of a run in each state"""
+        rows = self.connect().execute(
+            "SELECT state, COUNT(*) FROM work WHERE run = ? GROUP BY state", (run.id,))
+
+        return dict(rows.fetchall())